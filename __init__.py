@@ -25,11 +25,17 @@
 #
 #########################################################################
 
-import sqlvalidator
-import datetime
 import time
+_IMPORT_START = time.perf_counter()
+
+import datetime
 import re
+import os
+import json
 import queue
+import collections
+import zlib
+import types
 from dateutil.relativedelta import relativedelta
 from typing import Union
 import threading
@@ -39,7 +45,7 @@ from lib.item import Items
 from lib.item.item import Item
 from lib.shtime import Shtime
 from lib.plugin import Plugins
-from .webif import WebInterface
+from lib.module import Modules
 import lib.db
 
 DAY = 'day'
@@ -60,6 +66,8 @@ class DatabaseAddOn(SmartPlugin):
         Initializes the plugin.
         """
 
+        _init_start = time.perf_counter()
+
         # Call init code of parent class (SmartPlugin)
         super().__init__()
 
@@ -71,13 +79,28 @@ class DatabaseAddOn(SmartPlugin):
         # define cache dicts
         self.current_values = {}                     # Dict to hold min and max value of current day / week / month / year for items
         self.previous_values = {}                    # Dict to hold value of end of last day / week / month / year for items
-        self.item_cache = {}                         # Dict to hold item_id, oldest_log_ts and oldest_entry for items
+        self.item_cache = {}                         # Dict to hold state of database items (item_id, oldest_log_ts, oldest_entry) as DatabaseItemState
+        self.onchange_item_states = {}               # Dict to hold parsed config of on-change items as OnchangeItemState
+        self.counter_readings = {}                   # Dict to hold daily min / max values of counters for 'verbrauch' and 'zaehlerstand' items
+        self.serie_cache = {}                        # Dict to hold last result of 'serie' functions for incremental update
+        self.run_cache = {}                          # Dict to hold intermediate results shared by items of one calculation run
+        self.calendar = None                         # Calendar snapshot with boundaries of days, weeks, months, years shared by items of one calculation run
+        self.raw_query_cache = collections.OrderedDict()  # LRU cache of validation results of fetch_raw queries
+        self.raw_query_stats = {'hits': 0, 'misses': 0, 'validation_time': 0}  # Dict holding hits / misses of raw query cache and sum of validation time in seconds
+        self._onchange_database_items = set()        # Set of database items (or their path) of on-change items, collected during parse_item
+        self._parse_database_item_cache = {}         # Dict holding database item per parent item, used during parse_item
+        self.run_cache_stats = {'hits': 0, 'misses': 0}  # Dict holding count of hits and misses of prepared temperature lists in run cache
+        self.shadow_stats = {}                       # Dict holding count of comparisons, mismatches and durations of shadow mode per db_addon_fct
+        self.shadow_mismatches = collections.deque(maxlen=20)  # List of last mismatches of shadow mode
+        self.cache_stats = {'item_cache': {'hits': 0, 'misses': 0}, 'current_values': {'hits': 0, 'misses': 0}, 'previous_values': {'hits': 0, 'misses': 0}}  # Dict holding hits / misses of cache dicts
+        self.persistent_data = {}                    # Dict to hold data, which will be kept over restarts (like item metadata with oldest / newest log and count of entries)
 
         # define variables for database, database connection, working queue and status
         self.item_queue = queue.Queue()              # Queue containing all to be executed items
         self.work_item_queue_thread = None           # Working Thread for queue
         self._db_plugin = None                       # object if database plugin
         self._db = None                              # object of database
+        self._db_read = None                         # object of database used for heavy read queries (read-only connection to sqlite database in WAL mode or mysql replica)
         self.connection_data = None                  # connection data list of database
         self.db_driver = None                        # driver of the used database
         self.db_instance = None                      # instance of the used database
@@ -87,6 +110,32 @@ class DatabaseAddOn(SmartPlugin):
         self.startup_finished = False                # Startup of Plugin finished
         self.suspended = False                       # Is plugin activity suspended
         self.active_queue_item: str = '-'            # String holding item path of currently executed item
+        self._ondemand_in_progress = False           # Is on-demand item being calculated by worker
+        self.log_index_status = {}                   # Dict holding result of check of indexes of log table
+        self.log_index_creation = {}                 # Dict holding state of index creation requested via web interface like {'state': 'queued', 'time': ..., 'duration': ...}
+        self.overdue_queries = collections.deque(maxlen=20)  # List of last cancelled queries due to timeout
+        self.overdue_query_count = 0                 # Count of cancelled queries due to timeout
+        self._query_context = threading.local()      # Thread local context of query (like category of function for query timeout)
+        self._db_locks = {}                          # Dict holding lock per database connection; serializes queries of threads (worker, web interface), since sqlite progress handler (query timeout) and unbuffered mysql result are bound to connection
+        self.db_is_mariadb = None                    # Is database MariaDB (instead of MySQL)
+        self.deferred_items = {}                     # Dict of items deferred to off-peak window like {item: (anytime, deferred_since)}; anytime is True for startup items
+        self.item_durations = {}                     # Dict holding last duration of calculation in seconds per item path
+        self._offpeak_overdue_count = 0              # Count of cancelled queries at last off-peak tick
+        self.throttle_level = 0                      # Current throttle level (0 = no throttling ... 3 = max throttling)
+        self.query_latency = {'fast': None, 'slow': None}  # Short and long term average of query duration relative to median duration of its db_addon_fct / category
+        self.threads_running = None                  # Last value of Threads_running status of mysql database
+        self._throttle_checked = 0                   # Timestamp of last evaluation of throttle level
+        self.processed_items = {'ondemand': 0, 'onchange': 0}  # Count of processed items per kind since start
+        self.query_durations = {}                    # Dict holding deque of last query durations in seconds per db_addon_fct (or query category)
+        self.query_duration_totals = {}              # Dict holding count and sum of query durations in seconds per db_addon_fct (or query category)
+        self.db_connect_count = 0                    # Count of (re)connects to database
+        self.last_due_run_duration = None            # Duration of last run of due items in seconds (from execute_due_items until queue is worked off)
+        self._due_run_start = None                   # Timestamp of start of current run of due items
+        self.replica_lag = None                      # Last replication lag of mysql replica in seconds (None = unknown / replication not running)
+        self._replica_usable = False                 # Is mysql replica used for read queries (replication lag within limit)
+        self._replica_checked = 0                    # Timestamp of last check of replication lag
+        self._replica_status_query = None            # Query for replication status supported by replica
+        self.persistent_data_file = os.path.join(self.get_sh().get_vardir(), 'db_addon', 'persistent_data.json')  # file to store persistent data
 
         # define debug logs
         self.parse_debug = False                     # Enable / Disable debug logging for method 'parse item'
@@ -104,6 +153,14 @@ class DatabaseAddOn(SmartPlugin):
         self.startup_run_delay = self.get_parameter_value('startup_run_delay')
         self.ignore_0 = self.get_parameter_value('ignore_0')
         self.use_oldest_entry = self.get_parameter_value('use_oldest_entry')
+        self.query_timeout = {**DEFAULT_QUERY_TIMEOUT, **(self.get_parameter_value('query_timeout') or {})}
+        self.offpeak_window = parse_time_window(self.get_parameter_value('offpeak_window'))
+        self.offpeak_budget = self.get_parameter_value('offpeak_budget')
+        self.max_threads_running = self.get_parameter_value('max_threads_running')
+        self.shadow_sample = self.get_parameter_value('shadow_sample')
+        self.sqlite_read_connection = self.get_parameter_value('sqlite_read_connection')
+        self.replica_connect = self.get_parameter_value('replica_connect')
+        self.replica_max_lag = self.get_parameter_value('replica_max_lag')
 
         # init cache dicts
         self._init_cache_dicts()
@@ -116,8 +173,19 @@ class DatabaseAddOn(SmartPlugin):
             self.onchange_debug = True
             self.prepare_debug = True
 
-        # init webinterface
-        self.init_webinterface(WebInterface)
+        # init webinterface; import it (cherrypy, jinja2) just if http module is loaded
+        if Modules.get_instance().get_module('http') is not None:
+            from .webif import WebInterface
+            self.init_webinterface(WebInterface)
+        else:
+            self.logger.info("Module 'http' not loaded. Web interface will not be initialized.")
+
+        # check time budget of plugin load
+        _load_duration = IMPORT_DURATION + time.perf_counter() - _init_start
+        if _load_duration > LOAD_TIME_BUDGET:
+            self.logger.warning(f"Loading of plugin took {_load_duration:.3f}s (import {IMPORT_DURATION:.3f}s) and exceeded time budget of {LOAD_TIME_BUDGET}s.")
+        else:
+            self.logger.debug(f"Loading of plugin took {_load_duration:.3f}s (import {IMPORT_DURATION:.3f}s); time budget is {LOAD_TIME_BUDGET}s.")
 
     def run(self):
         """
@@ -145,18 +213,38 @@ class DatabaseAddOn(SmartPlugin):
         # check db connection settings
         if self.db_driver is not None and self.db_driver.lower() == 'pymysql':
             self._check_db_connection_setting()
+            self.db_is_mariadb = 'mariadb' in str(self._get_db_version()).lower()
+
+        # open read-only connection / connection to replica for heavy read queries
+        if self.db_driver is not None and self.db_driver.lower() == 'sqlite3' and self.sqlite_read_connection:
+            self._init_read_connection()
+        elif self.db_driver is not None and self.db_driver.lower() == 'pymysql' and self.replica_connect:
+            self._init_replica_connection()
+
+        # check index of log table
+        self._run_maintenance(self._check_db_log_index)
 
         # add scheduler for cyclic trigger item calculation
         self.scheduler_add('cyclic', self.execute_due_items, prio=3, cron='5 0 0 * * *', cycle=None, value=None, offset=None, next=None)
 
+        # add scheduler to work off items deferred to off-peak window
+        if self.offpeak_window:
+            self.logger.info(f"Heavy calculations will be spread over off-peak window {self.get_parameter_value('offpeak_window')} with budget of {self.offpeak_budget}s per minute.")
+            self.scheduler_add('offpeak', self.execute_offpeak_items, cycle=60)
+
         # add scheduler to trigger items to be calculated at startup with delay
         dt = self.shtime.now() + datetime.timedelta(seconds=(self.startup_run_delay + 3))
         self.logger.info(f"Set scheduler for calculating startup-items with delay of {self.startup_run_delay + 3}s to {dt}.")
         self.scheduler_add('startup', self.execute_startup_items, next=dt)
 
-        # update database_items in item config, where path was given
+        # register database items of on-change items and update database_items in item config, where path was given
+        self._register_database_items()
         self._update_database_items()
 
+        # load persistent data and fill item_cache with item_id and oldest_log for all database items
+        self._load_persistent_data()
+        self._run_maintenance(self._prefetch_item_cache)
+
         # set plugin to alive
         self.alive = True
 
@@ -171,7 +259,15 @@ class DatabaseAddOn(SmartPlugin):
         self.logger.debug("Stop method called")
         self.alive = False
         self.scheduler_remove('cyclic')
+        self.scheduler_remove('offpeak')
         self._work_item_queue_thread_shutdown()
+        self._save_persistent_data()
+        if self._db_read is not None:
+            try:
+                self._db_read.close()
+            except Exception:
+                pass
+            self._db_read = None
 
     def parse_item(self, item: Item):
         """
@@ -189,44 +285,25 @@ class DatabaseAddOn(SmartPlugin):
 
         def get_database_item() -> Item:
             """
-            Returns item from shNG config which is an item with database attribut valid for current db_addon item
+            Returns item from shNG config which is an item with database attribut valid for current db_addon item; result is cached per parent item
             """
 
-            _lookup_item = item.return_parent()
+            _parent = item.return_parent()
+            if _parent in self._parse_database_item_cache:
+                return self._parse_database_item_cache[_parent]
 
+            _database_item = None
+            _lookup_item = _parent
             for i in range(2):
                 if self.has_iattr(_lookup_item.conf, self.item_attribute_search_str):
                     self.logger.debug(f"Attribut '{self.item_attribute_search_str}' has been found for item={item.path()} {i + 1} level above item.")
-                    return _lookup_item
+                    _database_item = _lookup_item
+                    break
                 else:
                     _lookup_item = _lookup_item.return_parent()
 
-        def has_db_addon_item() -> bool:
-            """Returns item from shNG config which is item with db_addon attribut valid for database item"""
-
-            for child in item.return_children():
-                if check_db_addon_fct(child):
-                    return True
-
-                for child_child in child.return_children():
-                    if check_db_addon_fct(child_child):
-                        return True
-
-                    for child_child_child in child_child.return_children():
-                        if check_db_addon_fct(child_child_child):
-                            return True
-
-            return False
-
-        def check_db_addon_fct(check_item) -> bool:
-            """
-            Check if item has db_addon_fct and is onchange
-            """
-            if self.has_iattr(check_item.conf, 'db_addon_fct'):
-                if self.get_iattr_value(check_item.conf, 'db_addon_fct').lower() in ALL_ONCHANGE_ATTRIBUTES:
-                    self.logger.debug(f"db_addon item for database item {item.path()} found.")
-                    return True
-            return False
+            self._parse_database_item_cache[_parent] = _database_item
+            return _database_item
 
         # handle all items with db_addon_fct
         if self.has_iattr(item.conf, 'db_addon_fct'):
@@ -377,6 +454,10 @@ class DatabaseAddOn(SmartPlugin):
             else:
                 item_config_data_dict.update({'startup': False})
 
+            # remember database item of on-change items to register it after parsing
+            if db_addon_fct in ALL_ONCHANGE_ATTRIBUTES:
+                self._onchange_database_items.add(database_item)
+
             # add item to plugin item dict
             self.add_item(item, config_data_dict=item_config_data_dict)
 
@@ -393,11 +474,7 @@ class DatabaseAddOn(SmartPlugin):
             self.add_item(item, config_data_dict={'db_addon': 'admin', 'db_addon_fct': f"admin_{self.get_iattr_value(item.conf, 'db_addon_admin').lower()}", 'database_item': None})
             return self.update_item
 
-        # Reference to 'update_item' für alle Items mit Attribut 'database', um die on_change Items zu berechnen
-        elif self.has_iattr(item.conf, self.item_attribute_search_str) and has_db_addon_item():
-            self.logger.debug(f"reference to update_item for item '{item.path()}' will be set due to on-change")
-            self.add_item(item, config_data_dict={'db_addon': 'database'})
-            return self.update_item
+        # Items mit Attribut 'database' werden nach dem Parsen aller Items über _register_database_items registriert, um die on_change Items zu berechnen
 
     def update_item(self, item, caller=None, source=None, dest=None):
         """
@@ -433,6 +510,8 @@ class DatabaseAddOn(SmartPlugin):
                     item(False, self.get_shortname())
                 elif self.get_iattr_value(item.conf, 'db_addon_admin') == 'clean_cache_values':
                     self._init_cache_dicts()
+                    self.persistent_data.pop('temperature_sums', None)
+                    self.persistent_data.pop('consumption_prefix', None)
                     item(False, self.get_shortname())
 
     def execute_due_items(self) -> None:
@@ -444,8 +523,15 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.debug("execute_due_items called")
 
         if not self.suspended:
-            _todo_items = self._create_due_items()
+            self._run_maintenance(self._refresh_item_meta, self._all_database_items())
+            self._save_persistent_data()
+            _start = time.time()
+            _todo_items = self._create_recalc_plan(self._defer_heavy_items(self._create_due_items()))
             self.logger.info(f"{len(_todo_items)} items are due and will be calculated.")
+            if _todo_items:
+                self._due_run_start = _start
+            else:
+                self.last_due_run_duration = round(time.time() - _start, 1)
             [self.item_queue.put(i) for i in _todo_items]
         else:
             self.logger.info(f"Plugin is suspended. No items will be calculated.")
@@ -458,12 +544,121 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.debug("execute_startup_items called")
 
         if not self.suspended:
-            self.logger.info(f"{len(self._startup_items())} items will be calculated at startup.")
-            [self.item_queue.put(i) for i in self._startup_items()]
+            _todo_items = self._create_recalc_plan(self._defer_heavy_items(self._startup_items(), anytime=True))
+            self.logger.info(f"{len(_todo_items)} items will be calculated at startup.")
+            [self.item_queue.put(i) for i in _todo_items]
             self.startup_finished = True
         else:
             self.logger.info(f"Plugin is suspended. No items will be calculated.")
 
+    def execute_offpeak_items(self) -> None:
+        """
+        Put deferred items to queue within time budget, if off-peak window is active (or for deferred startup items) and database is not busy.
+        Items deferred for longer than OFFPEAK_MAX_DEFERRAL are put to queue in any case.
+        """
+
+        if not self.deferred_items or self.suspended:
+            return
+
+        in_window = in_time_window(self.shtime.now().time(), self.offpeak_window)
+
+        # release items deferred for too long regardless of window, load and budget
+        now = time.time()
+        released = [item for item, (_, since) in self.deferred_items.items() if now - since > OFFPEAK_MAX_DEFERRAL]
+        if released:
+            self.logger.info(f"{len(released)} deferred items exceeded maximum deferral of {OFFPEAK_MAX_DEFERRAL}s and will be calculated now.")
+
+        # wait for queue being worked off and no query being cancelled since last tick
+        if self.item_queue.qsize() > 0 or self.overdue_query_count > self._offpeak_overdue_count:
+            if self.execute_debug:
+                self.logger.debug(f"execute_offpeak_items: Database busy; {len(self.deferred_items) - len(released)} deferred items will wait.")
+            self._offpeak_overdue_count = self.overdue_query_count
+        else:
+            self._update_throttle_level()
+            budget = self.offpeak_budget * THROTTLE_BUDGET_FACTOR[self.throttle_level]
+            if not budget and self.execute_debug:
+                self.logger.debug(f"execute_offpeak_items: Throttle level {self.throttle_level}; {len(self.deferred_items) - len(released)} deferred items will wait.")
+
+            for item, (anytime, _) in list(self.deferred_items.items()):
+                if not budget:
+                    break
+                if item in released or (not in_window and not anytime):
+                    continue
+                duration = self.item_durations.get(str(item.path()), self.offpeak_budget)
+                if budget < self.offpeak_budget * THROTTLE_BUDGET_FACTOR[self.throttle_level] and duration > budget:
+                    break
+                budget = max(budget - duration, 0)
+                released.append(item)
+
+        if not released:
+            return
+
+        for item in released:
+            del self.deferred_items[item]
+        [self.item_queue.put(i) for i in self._create_recalc_plan(released)]
+
+        if self.execute_debug:
+            self.logger.debug(f"execute_offpeak_items: {len(released)} items released, {len(self.deferred_items)} deferred items left.")
+
+    def _update_throttle_level(self) -> None:
+        """
+        Evaluate throttle level. For mysql with 'max_threads_running', Threads_running status of database is used as signal of
+        contention; otherwise ratio of short to long term query duration, each relative to usual duration of its function.
+        Evaluation is done every THROTTLE_CHECK_INTERVAL seconds at most.
+        """
+
+        now = time.time()
+        if now - self._throttle_checked < THROTTLE_CHECK_INTERVAL:
+            return
+        self._throttle_checked = now
+
+        level = None
+
+        # compare running threads of mysql with maximum
+        if self.db_driver.lower() == 'pymysql' and self.max_threads_running:
+            result = self._get_db_threads_running()
+            self.threads_running = to_int(result[1]) if result else None
+            if self.threads_running is not None:
+                level = sum(self.threads_running >= self.max_threads_running * factor for factor in THROTTLE_THREADS_FACTOR)
+
+        # compare short term relative query duration with long term relative query duration
+        if level is None:
+            level = 0
+            if self.query_latency['slow']:
+                ratio = self.query_latency['fast'] / self.query_latency['slow']
+                level = sum(ratio > threshold for threshold in THROTTLE_LATENCY_RATIO)
+
+        if level != self.throttle_level:
+            self.logger.info(f"Throttle level changed from {self.throttle_level} to {level} (query_latency={self.query_latency}, threads_running={self.threads_running}).")
+            self.throttle_level = level
+
+    def _defer_heavy_items(self, items: list, anytime: bool = False) -> list:
+        """
+        Defer heavy items ('serie', 'summe', 'wachstumsgradtage' and yearly items) to off-peak window, if defined
+
+        :param items: list of items to be calculated
+        :param anytime: deferred items may be calculated outside of off-peak window (like startup items)
+
+        :return: list of items to be calculated immediately
+        """
+
+        if not self.offpeak_window:
+            return items
+
+        _todo_items = []
+        for item in items:
+            item_config = self.get_item_config(item)
+            if is_heavy_function(item_config.get('db_addon_fct'), item_config.get('cycle')):
+                _anytime, _since = self.deferred_items.get(item, (True, time.time()))
+                self.deferred_items[item] = (_anytime and anytime, _since)
+            else:
+                _todo_items.append(item)
+
+        if self.deferred_items:
+            self.logger.info(f"{len(self.deferred_items)} heavy items deferred to off-peak window.")
+
+        return _todo_items
+
     def execute_static_items(self) -> None:
         """
         Execute all static items
@@ -497,7 +692,10 @@ class DatabaseAddOn(SmartPlugin):
 
         if not self.suspended:
             self.logger.info(f"Values for all {len(self._ondemand_items())} items with 'db_addon_fct' attribute, which are not 'on-change', will be calculated!")
-            [self.item_queue.put(i) for i in self._ondemand_items()]
+            self.serie_cache = {}
+            self.persistent_data.pop('temperature_sums', None)
+            self.persistent_data.pop('consumption_prefix', None)
+            [self.item_queue.put(i) for i in self._create_recalc_plan(self._ondemand_items())]
         else:
             self.logger.info(f"Plugin is suspended. No items will be calculated.")
 
@@ -512,17 +710,48 @@ class DatabaseAddOn(SmartPlugin):
                 self.logger.info(f"     Queue Entry: '{queue_entry}' received.")
             except queue.Empty:
                 self.active_queue_item = '-'
-                pass
+                self.calendar = None
             else:
-                if isinstance(queue_entry, tuple):
+                self._update_throttle_level()
+
+                if queue_entry == QUEUE_CREATE_LOG_INDEX:
+                    self.active_queue_item = QUEUE_CREATE_LOG_INDEX
+                    self._run_maintenance(self._create_log_index)
+
+                elif isinstance(queue_entry, tuple):
                     item, value = queue_entry
                     self.logger.info(f"# {self.item_queue.qsize() + 1} item(s) to do. || 'on-change' item '{item.path()}' with {value=} will be processed.")
                     self.active_queue_item = str(item.path())
-                    self.handle_onchange(item, value)
+                    self._query_context.category = 'onchange'
+                    try:
+                        self.handle_onchange(item, value)
+                    finally:
+                        self._query_context.category = None
+                        self.processed_items['onchange'] += 1
                 else:
+                    # throttle on-demand items only; on-change items are cheap and need to be processed in time
+                    if self.throttle_level:
+                        time.sleep(THROTTLE_DELAY[self.throttle_level])
                     self.logger.info(f"# {self.item_queue.qsize() + 1} item(s) to do. || 'on-demand' item '{queue_entry.path()}' will be processed.")
                     self.active_queue_item = str(queue_entry.path())
-                    self.handle_ondemand(queue_entry)
+                    _db_addon_fct = self.get_item_config(queue_entry).get('db_addon_fct')
+                    self._query_context.category = get_query_category(_db_addon_fct)
+                    self._query_context.fct = _db_addon_fct
+                    _start = time.time()
+                    self._ondemand_in_progress = True
+                    try:
+                        self.handle_ondemand(queue_entry)
+                    finally:
+                        self._ondemand_in_progress = False
+                        self._query_context.category = None
+                        self._query_context.fct = None
+                        self.item_durations[str(queue_entry.path())] = round(time.time() - _start, 1)
+                        self.processed_items['ondemand'] += 1
+
+                # run of due items finished, if queue is worked off
+                if self._due_run_start is not None and self.item_queue.empty():
+                    self.last_due_run_duration = round(time.time() - self._due_run_start, 1)
+                    self._due_run_start = None
 
     def handle_ondemand(self, item: Item) -> None:
         """
@@ -531,6 +760,38 @@ class DatabaseAddOn(SmartPlugin):
         :param item: Item for which value will be calculated
         """
 
+        db_addon_fct = self.get_item_config(item)['db_addon_fct']
+
+        _start = time.time()
+        result = self._calculate_ondemand(item)
+        _duration = time.time() - _start
+
+        # log result
+        if self.execute_debug:
+            self.logger.debug(f"handle_ondemand: result is {result} for item '{item.path()}' with '{db_addon_fct=}'")
+
+        if result is None:
+            self.logger.info(f"  Result was None; No item value will be set.")
+            return
+
+        # compare result with reference calculation by per-period queries for sample of items
+        if self._is_shadow_item(item):
+            self._shadow_compare(item, result, _duration)
+
+        # set item value and put data into plugin_item_dict
+        self.logger.info(f"  Item value for '{item.path()}' will be set to {result}")
+        item_config = self.get_item_config(item)
+        item_config.update({'value': result})
+        item(result, self.get_shortname())
+
+    def _calculate_ondemand(self, item: Item):
+        """
+        Calculate value for requested item and fill cache dicts
+
+        :param item: Item for which value will be calculated
+        :return: value of item; None, if not available
+        """
+
         # set/get parameters
         item_config = self.get_item_config(item)
         db_addon = item_config['db_addon']
@@ -688,19 +949,89 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.warning(f"handle_ondemand: Function '{db_addon_fct}' for item {item.path()} not defined or found.")
             return
 
-        # log result
-        if self.execute_debug:
-            self.logger.debug(f"handle_ondemand: result is {result} for item '{item.path()}' with '{db_addon_fct=}'")
+        return result
 
-        if result is None:
-            self.logger.info(f"  Result was None; No item value will be set.")
-            return
+    def _is_shadow_item(self, item: Item) -> bool:
+        """
+        Check if item belongs to sample of shadow mode (parameter 'shadow_sample' in percent); sample is stable over restarts
 
-        # set item value and put data into plugin_item_dict
-        self.logger.info(f"  Item value for '{item.path()}' will be set to {result}")
+        :param item: on-demand item
+        :return: True, if result of item should be compared
+        """
+
+        if not self.shadow_sample:
+            return False
         item_config = self.get_item_config(item)
-        item_config.update({'value': result})
-        item(result, self.get_shortname())
+        if item_config['db_addon'] == 'info' or item_config['db_addon_fct'] in ALL_GEN_ATTRIBUTES or item_config['db_addon_fct'] == 'db_request':
+            return False
+        return zlib.crc32(str(item.path()).encode()) % 100 < self.shadow_sample
+
+    def _shadow_compare(self, item: Item, result, duration: float) -> None:
+        """
+        Calculate value of item again as reference calculation and compare it with given result. The reference calculation
+        uses the per-period queries without cached and incremental intermediate results (serie cache, counter readings,
+        run cache, temperature sums, cumulative consumption). Mismatches and ratio of duration are recorded per db_addon_fct.
+        Comparison is skipped, if plugin is throttled.
+
+        :param item: on-demand item
+        :param result: result of regular calculation
+        :param duration: duration of regular calculation in seconds
+        """
+
+        db_addon_fct = self.get_item_config(item)['db_addon_fct']
+        stats = self.shadow_stats.setdefault(db_addon_fct, {'count': 0, 'mismatches': 0, 'skipped': 0, 'duration': 0, 'reference_duration': 0, 'ratio': None})
+
+        if self.throttle_level:
+            stats['skipped'] += 1
+            if self.execute_debug:
+                self.logger.debug(f"_shadow_compare: Reference calculation for item {item.path()} skipped due to throttle level {self.throttle_level}.")
+            return
+
+        self._query_context.reference = True
+        _start = time.time()
+        try:
+            reference = self._calculate_ondemand(item)
+        except Exception as e:
+            self.logger.warning(f"_shadow_compare: Reference calculation for item {item.path()} with {db_addon_fct=} failed: {e}")
+            return
+        finally:
+            self._query_context.reference = False
+        reference_duration = time.time() - _start
+
+        stats['count'] += 1
+        stats['duration'] += duration
+        stats['reference_duration'] += reference_duration
+        stats['ratio'] = round(stats['duration'] / stats['reference_duration'], 2) if stats['reference_duration'] else None
+
+        if not results_equal(result, reference):
+            stats['mismatches'] += 1
+            self.shadow_mismatches.append({'time': self.shtime.now().strftime('%d.%m.%Y %H:%M:%S'), 'item': str(item.path()), 'db_addon_fct': db_addon_fct, 'result': result, 'reference': reference})
+            self.logger.warning(f"Shadow mode: Result {result} of item {item.path()} with {db_addon_fct=} differs from reference calculation {reference}.")
+        elif self.execute_debug:
+            self.logger.debug(f"_shadow_compare: Result of item {item.path()} with {db_addon_fct=} matches reference calculation; duration {round(duration, 3)}s vs. {round(reference_duration, 3)}s.")
+
+    def _is_reference_calculation(self) -> bool:
+        """
+        Check if current calculation is reference calculation of shadow mode
+
+        :return: True, if cached and incremental intermediate results must not be used
+        """
+
+        return getattr(self._query_context, 'reference', False)
+
+    def shadow_summary(self) -> str:
+        """
+        Get summary of shadow mode for web interface
+
+        :return: summary string
+        """
+
+        if not self.shadow_sample:
+            return '-'
+        count = sum(stats['count'] for stats in self.shadow_stats.values())
+        mismatches = sum(stats['mismatches'] for stats in self.shadow_stats.values())
+        skipped = sum(stats['skipped'] for stats in self.shadow_stats.values())
+        return f"{self.shadow_sample}% der Items: {count} Vergleiche, {mismatches} Abweichungen, {skipped} wegen Drosselung ausgelassen"
 
     def handle_onchange(self, updated_item: Item, value: float) -> None:
         """
@@ -718,19 +1049,17 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.debug(f"Following items where identified for update: {relevant_item_list}.")
 
         for item in relevant_item_list:
-            item_config = self.get_item_config(item)
-            _database_item = item_config['database_item']
-            _db_addon_fct = item_config['db_addon_fct']
-            _ignore_value = item_config['ignore_value']
-            _var = _db_addon_fct.split('_')
+            _state = self._get_onchange_item_state(item)
+            _database_item = _state.database_item
+            _ignore_value = _state.ignore_value
 
             # handle minmax on-change items like minmax_heute_max, minmax_heute_min, minmax_woche_max, minmax_woche_min.....
-            if _db_addon_fct.startswith('minmax') and len(_var) == 3 and _var[2] in ['min', 'max']:
-                _timeframe = convert_timeframe(_var[1])
-                _func = _var[2]
-                _cache_dict = self.current_values[_timeframe]
+            if _state.kind == 'minmax':
+                _timeframe = _state.timeframe
+                _func = _state.func
                 if not _timeframe:
                     return
+                _cache_dict = self.current_values[_timeframe]
 
                 if self.onchange_debug:
                     self.logger.debug(f"handle_onchange: 'minmax' item {updated_item.path()} with {_func=} detected. Check for update of _cache_dicts and item value.")
@@ -742,12 +1071,14 @@ class DatabaseAddOn(SmartPlugin):
                 if _database_item not in _cache_dict:
                     _cache_dict[_database_item] = {}
                 if _cache_dict[_database_item].get(_func) is None:
+                    self.cache_stats['current_values']['misses'] += 1
                     _query_params = {'func': _func, 'item': _database_item, 'timeframe': _timeframe, 'start': 0, 'end': 0, 'ignore_value': _ignore_value}
                     _cached_value = self._query_item(**_query_params)[0][1]
                     _initial_value = True
                     if self.onchange_debug:
                         self.logger.debug(f"handle_onchange: Item={updated_item.path()} with _func={_func} and _timeframe={_timeframe} not in cache dict. recent value={_cached_value}.")
                 else:
+                    self.cache_stats['current_values']['hits'] += 1
                     _cached_value = _cache_dict[_database_item][_func]
 
                 if _cached_value:
@@ -781,20 +1112,22 @@ class DatabaseAddOn(SmartPlugin):
                     self.logger.info(f"Received value={value} is not influencing min / max value. Therefore item {item.path()} will not be changed.")
 
             # handle verbrauch on-change items ending with heute, woche, monat, jahr
-            elif _db_addon_fct.startswith('verbrauch') and len(_var) == 2 and _var[1] in ['heute', 'woche', 'monat', 'jahr']:
-                _timeframe = convert_timeframe(_var[1])
-                _cache_dict = self.previous_values[_timeframe]
+            elif _state.kind == 'verbrauch':
+                _timeframe = _state.timeframe
                 if _timeframe is None:
                     return
+                _cache_dict = self.previous_values[_timeframe]
 
                 # make sure, that database item is in cache dict
                 if _database_item not in _cache_dict:
+                    self.cache_stats['previous_values']['misses'] += 1
                     _query_params = {'func': 'max', 'item': _database_item, 'timeframe': _timeframe, 'start': 1, 'end': 1, 'ignore_value': _ignore_value}
                     _cached_value = self._query_item(**_query_params)[0][1]
                     _cache_dict[_database_item] = _cached_value
                     if self.onchange_debug:
                         self.logger.debug(f"handle_onchange: Item={updated_item.path()} with {_timeframe=} not in cache dict. Value {_cached_value} has been added.")
                 else:
+                    self.cache_stats['previous_values']['hits'] += 1
                     _cached_value = _cache_dict[_database_item]
 
                 # calculate value, set item value, put data into plugin_item_dict
@@ -807,6 +1140,38 @@ class DatabaseAddOn(SmartPlugin):
                 else:
                     self.logger.info(f"Value for end of last {_timeframe} not available. No item value will be set.")
 
+    def _get_onchange_item_state(self, item: Item) -> 'OnchangeItemState':
+        """
+        Get parsed config of on-change item from cache dict; parses item config at first call
+
+        :param item: on-change item
+        :return: state record of on-change item
+        """
+
+        _state = self.onchange_item_states.get(item)
+        if _state is None:
+            item_config = self.get_item_config(item)
+            _state = self.onchange_item_states[item] = OnchangeItemState(item_config['database_item'], item_config['db_addon_fct'], item_config.get('ignore_value'))
+        return _state
+
+    def _register_database_items(self) -> None:
+        """
+        Register database items of 'on-change' items collected during parse_item: add them to plugin items and set reference to update_item
+        """
+
+        for database_item in self._onchange_database_items:
+            if isinstance(database_item, str):
+                database_item = self.items.return_item(database_item)
+            if database_item is None or not self.has_iattr(database_item.conf, self.item_attribute_search_str) or database_item in self._database_items():
+                continue
+
+            self.logger.debug(f"reference to update_item for item '{database_item.path()}' will be set due to on-change")
+            self.add_item(database_item, config_data_dict={'db_addon': 'database'})
+            database_item.add_method_trigger(self.update_item)
+
+        self._onchange_database_items = set()
+        self._parse_database_item_cache = {}
+
     def _update_database_items(self):
         for item in self._database_item_path_items():
             item_config = self.get_item_config(item)
@@ -819,6 +1184,147 @@ class DatabaseAddOn(SmartPlugin):
             else:
                 item_config.update({'database_item': database_item})
 
+    def _all_database_items(self) -> list:
+        """
+        Returns all database items, which are used by plugin items
+        """
+
+        database_items = set(self._database_items())
+        for item in self.get_item_list('db_addon', 'function'):
+            database_item = self.get_item_config(item).get('database_item')
+            if isinstance(database_item, Item):
+                database_items.add(database_item)
+
+        return list(database_items)
+
+    def _run_maintenance(self, func, *args):
+        """
+        Run maintenance function (like refresh of metadata or check of indexes) with time limit of query category 'maintenance'
+
+        :param func: function to be run
+        :param args: arguments of function
+        :return: return value of function
+        """
+
+        _category = getattr(self._query_context, 'category', None)
+        self._query_context.category = 'maintenance'
+        try:
+            return func(*args)
+        finally:
+            self._query_context.category = _category
+
+    def _prefetch_item_cache(self) -> None:
+        """
+        Get item_id and timestamp of the oldest log of all database items with set-based queries and put it to cache dict
+        """
+
+        database_items = self._all_database_items()
+        if not database_items:
+            return
+
+        _start = time.time()
+        self._refresh_item_meta(database_items)
+        item_ids = self._get_itemids(database_items)
+        oldest_logs = self._get_oldest_logs(database_items)
+        self.logger.info(f"Item_id for {len(item_ids)} and oldest_log for {len(oldest_logs)} of {len(database_items)} database items prefetched within {round(time.time() - _start, 2)}s.")
+
+    def _refresh_item_meta(self, items: list) -> None:
+        """
+        Refresh metadata (oldest log, oldest value, newest log, count of entries) of database items incrementally and put it to cache dict.
+        Only entries newer than the last refresh will be counted; metadata of an item will be rebuilt, if its oldest entry was deleted from database.
+
+        :param items: list of database items
+        """
+
+        item_meta = self.persistent_data.setdefault('item_meta', {})
+        item_ids = self._get_itemids(items)
+        id_to_item = {item_id: item for item, item_id in item_ids.items()}
+
+        # split into items with valid metadata and items, for which metadata need to be created
+        known = {}
+        unknown = {}
+        for item_id, item in id_to_item.items():
+            meta = item_meta.get(str(item.path()))
+            if meta and meta.get('id') == item_id and meta.get('oldest_log') is not None:
+                known[item_id] = item
+            else:
+                unknown[item_id] = item
+
+        # check, if oldest entry still exists (database plugin may have deleted old entries)
+        if known:
+            rows = self._read_log_timestamp_items({item_id: item_meta[str(item.path())]['oldest_log'] for item_id, item in known.items()})
+            if rows is None:
+                return
+            found = {row[0]: row[2] for row in rows}
+            for item_id in list(known):
+                if item_id in found:
+                    item_meta[str(known[item_id].path())]['oldest_value'] = found[item_id]
+                else:
+                    unknown[item_id] = known.pop(item_id)
+
+        # create metadata
+        if unknown:
+            if self.prepare_debug:
+                self.logger.debug(f"_refresh_item_meta: Metadata for items={[str(item.path()) for item in unknown.values()]} will be created.")
+            new = {}
+            for item_id, oldest_log in self._read_log_oldest_items(list(unknown)) or []:
+                if oldest_log is not None:
+                    new[item_id] = oldest_log
+                    item_meta[str(unknown[item_id].path())] = {'id': item_id, 'oldest_log': oldest_log, 'oldest_value': None, 'newest_log': oldest_log - 1, 'count': 0}
+            if new:
+                for item_id, _, value in self._read_log_timestamp_items(new) or []:
+                    item_meta[str(unknown[item_id].path())]['oldest_value'] = value
+                    known[item_id] = unknown[item_id]
+
+        # add count of entries since last refresh
+        if known:
+            rows = self._read_log_count_newest_items({item_id: item_meta[str(item.path())]['newest_log'] for item_id, item in known.items()})
+            for item_id, count, newest_log in rows or []:
+                if newest_log is not None:
+                    meta = item_meta[str(known[item_id].path())]
+                    meta['count'] += count
+                    meta['newest_log'] = newest_log
+
+        # put data to cache dict
+        for item_id, item in known.items():
+            meta = item_meta[str(item.path())]
+            _state = self._get_database_item_state(item)
+            _state.id, _state.oldest_log, _state.oldest_value = item_id, meta['oldest_log'], meta['oldest_value']
+
+    def _get_item_meta(self, item: Item) -> dict:
+        """
+        Returns persistent metadata of database item
+        """
+
+        return self.persistent_data.get('item_meta', {}).get(str(item.path()), {})
+
+    def _load_persistent_data(self) -> None:
+        """
+        Load persistent data from file
+        """
+
+        try:
+            with open(self.persistent_data_file, 'r') as f:
+                self.persistent_data = json.load(f)
+        except FileNotFoundError:
+            self.persistent_data = {}
+        except Exception as e:
+            self.logger.warning(f"Error {e} occurred during loading of persistent data from {self.persistent_data_file}. Data will be created again.")
+            self.persistent_data = {}
+
+    def _save_persistent_data(self) -> None:
+        """
+        Save persistent data to file
+        """
+
+        try:
+            os.makedirs(os.path.dirname(self.persistent_data_file), exist_ok=True)
+            with open(f"{self.persistent_data_file}.tmp", 'w') as f:
+                json.dump(self.persistent_data, f)
+            os.replace(f"{self.persistent_data_file}.tmp", self.persistent_data_file)
+        except Exception as e:
+            self.logger.warning(f"Error {e} occurred during saving of persistent data to {self.persistent_data_file}.")
+
     @property
     def log_level(self):
         return self.logger.getEffectiveLevel()
@@ -963,6 +1469,32 @@ class DatabaseAddOn(SmartPlugin):
 
         return self._query_item(func, item, timeframe, start, end, group, group2, ignore_value)
 
+    def query_items(self, func: str, item_paths: list, timeframe: str, start: int = None, end: int = 0, group: str = None, ignore_value=None) -> dict:
+        """
+        Query database for several items at once, format response and return it per item
+
+        :param func: function to be used at query (avg, min, max, sum, on, integrate, raw)
+        :param item_paths: list of item paths for which the query should be done
+        :param timeframe: time increment für definition of start, end (day, week, month, year)
+        :param start: start of timeframe (oldest) for query given in x time increments (default = None, meaning complete database)
+        :param end: end of timeframe (newest) for query given in x time increments (default = 0, meaning today, end of last week, end of last month, end of last year)
+        :param group: grouping parameter (default = None, possible values: day, week, month, year)
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: dict with item_path as key and formatted query response as value
+        """
+
+        items = []
+        for item_path in item_paths:
+            item = self.items.return_item(item_path)
+            if item is None:
+                self.logger.warning(f"query_items: Item {item_path!r} not found and will be ignored.")
+            else:
+                items.append(item)
+
+        result = self._query_items(func=func, items=items, timeframe=timeframe, start=start, end=end, group=group, ignore_value=ignore_value)
+        return {str(item.path()): value for item, value in result.items()}
+
     def fetch_log(self, func: str, item_path: str, timeframe: str, start: int = None, end: int = 0, count: int = None, group: str = None, group2: str = None, ignore_value=None) -> list:
         """
         Query database, format response and return it
@@ -1002,14 +1534,52 @@ class DatabaseAddOn(SmartPlugin):
         if params is None:
             params = {}
 
+        validation = self._validate_raw_query(query)
+        if validation is None:
+            return
+
+        if not validation['valid']:
+            self.logger.error(f"fetch_raw: Validation of query failed with error: {validation['errors']}")
+            return
+
+        self._query_context.category = 'fetch_raw'
+        try:
+            return self._fetchall(query, params, db=self._get_read_db())
+        finally:
+            self._query_context.category = None
+
+    def _validate_raw_query(self, query: str) -> Union[dict, None]:
+        """
+        Get validation result of query from LRU cache or validate query with sqlvalidator and put result to cache
+
+        :param query: database query to be validated
+        :return: dict like {'valid': bool, 'errors': list, 'normalized': formatted query}; None, if sqlvalidator is not available
+        """
+
+        validation = self.raw_query_cache.get(query)
+        if validation is not None:
+            self.raw_query_cache.move_to_end(query)
+            self.raw_query_stats['hits'] += 1
+            return validation
+
+        try:
+            import sqlvalidator
+        except ImportError as e:
+            self.logger.error(f"fetch_raw: Package 'sqlvalidator' needed for validation of query not available: {e}")
+            return
+
+        _start = time.perf_counter()
         formatted_sql = sqlvalidator.format_sql(query)
         sql_query = sqlvalidator.parse(formatted_sql)
+        validation = {'valid': sql_query.is_valid(), 'errors': sql_query.errors, 'normalized': formatted_sql}
+        self.raw_query_stats['misses'] += 1
+        self.raw_query_stats['validation_time'] = round(self.raw_query_stats['validation_time'] + time.perf_counter() - _start, 4)
 
-        if not sql_query.is_valid():
-            self.logger.error(f"fetch_raw: Validation of query failed with error: {sql_query.errors}")
-            return
+        self.raw_query_cache[query] = validation
+        if len(self.raw_query_cache) > RAW_QUERY_CACHE_SIZE:
+            self.raw_query_cache.popitem(last=False)
 
-        return self._fetchall(query, params)
+        return validation
 
     def suspend(self, state: bool = False) -> bool:
         """
@@ -1094,9 +1664,12 @@ class DatabaseAddOn(SmartPlugin):
         if self.execute_debug:
             self.logger.debug(f"_handle_min_max: db_addon_fct={log_text} function detected. {query_params=}")
 
+        if group:
+            return self._query_serie(db_addon_fct, **query_params)
+
         return self._query_item(**query_params)
 
-    def _handle_zaehlerstand(self, database_item: Item, db_addon_fct: str, ignore_value=None) -> Union[list, None]:
+    def _handle_zaehlerstand(self, database_item: Item, db_addon_fct: str, ignore_value=None) -> Union[list, float, None]:
         """
         Handle execution of Zaehlerstand calculation
         """
@@ -1111,14 +1684,16 @@ class DatabaseAddOn(SmartPlugin):
         group2 = None
 
         # handle functions starting with 'zaehlerstand' like 'zaehlerstand_heute_minus1'
-        if len(_var) == 3 and _var[1] == 'zaehlerstand':
-            func = 'max'
-            timeframe = convert_timeframe(_var[1])
-            start = to_int(_var[2][-1])
-            end = start
-            log_text = 'zaehlerstand'
-            if timeframe is None or start is None:
+        if len(_var) == 3 and _var[0] == 'zaehlerstand':
+            _range = get_counter_reading_range(db_addon_fct, today=self._get_calendar()['today'])
+            if _range is None:
                 return
+            timeframe, start, end = _range
+
+            if self.execute_debug:
+                self.logger.debug(f"_handle_zaehlerstand: db_addon_fct=zaehlerstand function detected. {timeframe=}, {start=}, {end=}")
+
+            return self._query_counter_reading(database_item, timeframe, start, end, ignore_value)
 
         # handle all functions 'serie_min/max/avg' in format 'serie_minmax_timeframe_func_count_group' like 'serie_zaehlerstand_tag_30d'
         elif _var[0] == 'serie' and _var[1] == 'zaehlerstand':
@@ -1139,7 +1714,7 @@ class DatabaseAddOn(SmartPlugin):
         if self.execute_debug:
             self.logger.debug(f"_handle_zaehlerstand: db_addon_fct={log_text} function detected. {query_params=}")
 
-        return self._query_item(**query_params)
+        return self._query_serie(db_addon_fct, **query_params)
 
     def _handle_verbrauch(self, database_item: Item, db_addon_fct: str, ignore_value=None):
         """
@@ -1159,36 +1734,24 @@ class DatabaseAddOn(SmartPlugin):
             if self.prepare_debug:
                 self.logger.debug(f"_consumption_calc called with {database_item=}, {timeframe=}, {c_start=}, {c_end=}")
 
-            _result = None
-            _query_params = {'item': database_item, 'timeframe': timeframe}
-
-            # get value for end and check it;
-            _query_params.update({'func': 'max', 'start': c_end, 'end': c_end})
-            value_end = self._query_item(**_query_params)[0][1]
+            value_end, value_start, value_prev = self._query_consumption(database_item, timeframe, c_start, c_end)
 
             if self.prepare_debug:
-                self.logger.debug(f"_consumption_calc {value_end=}")
+                self.logger.debug(f"_consumption_calc {value_end=}, {value_start=}, {value_prev=}")
 
             if value_end is None:  # if None (Error) return
                 return
             elif value_end == 0:  # wenn die Query "None" ergab, was wiederum bedeutet, dass zum Abfragezeitpunkt keine Daten vorhanden sind, ist der value hier gleich 0 → damit der Verbrauch für die Abfrage auch Null
                 return 0
 
-            # get value for start and check it;
-            _query_params.update({'func': 'min', 'start': c_end, 'end': c_end})
-            value_start = self._query_item(**_query_params)[0][1]
-            if self.prepare_debug:
-                self.logger.debug(f"_consumption_calc {value_start=}")
-
             if value_start is None:  # if None (Error) return
                 return
 
-            if value_start == 0:  # wenn der Wert zum Startzeitpunkt 0 ist, gab es dort keinen Eintrag (also keinen Verbrauch), dann frage den nächsten Eintrag in der DB ab.
-                self.logger.info(f"No DB Entry found for requested start date. Looking for next DB entry.")
-                _query_params.update({'func': 'next', 'start': c_start, 'end': c_end})
-                value_start = self._query_item(**_query_params)[0][1]
+            if value_start == 0:  # wenn der Wert zum Startzeitpunkt 0 ist, gab es dort keinen Eintrag (also keinen Verbrauch), dann nimm den vorherigen Eintrag in der DB.
+                self.logger.info(f"No DB Entry found for requested start date. Using previous DB entry.")
+                value_start = value_prev
                 if self.prepare_debug:
-                    self.logger.debug(f"_consumption_calc: next available value is {value_start=}")
+                    self.logger.debug(f"_consumption_calc: previous available value is {value_start=}")
 
             # calculate result
             if value_start is not None:
@@ -1202,59 +1765,28 @@ class DatabaseAddOn(SmartPlugin):
 
         _var = db_addon_fct.split('_')
 
-        # handle all functions 'verbrauch' in format 'verbrauch_timeframe_timedelta' like 'verbrauch_heute_minus2'
-        if len(_var) == 3 and _var[1] in ['heute', 'woche', 'monat', 'jahr'] and _var[2].startswith('minus'):
-            timeframe = convert_timeframe(_var[1])
-            timedelta = to_int(_var[2][-1])
-            if timedelta is None or timeframe is None:
-                return
-
+        # handle all functions 'verbrauch' in format 'verbrauch_function_window_timeframe_timedelta' like 'verbrauch_rolling_12m_woche_minus1'
+        if len(_var) == 5 and _var[1] == 'rolling':
             if self.execute_debug:
-                self.logger.debug(f"_handle_verbrauch: '{db_addon_fct}' function detected. {timeframe=}, {timedelta=}")
+                self.logger.debug(f"_handle_verbrauch: '{db_addon_fct}' function detected.")
 
-            return consumption_calc(c_start=timedelta + 1, c_end=timedelta)
+            return self._query_rolling_consumption(database_item, db_addon_fct)
 
-        # handle all functions of format 'verbrauch_function_window_timeframe_timedelta' like 'verbrauch_rolling_12m_woche_minus1'
-        elif len(_var) == 5 and _var[1] == 'rolling' and _var[4].startswith('minus'):
-            func = _var[1]
-            window = _var[2]  # 12m
-            window_inc = to_int(window[:-1])  # 12
-            window_dur = convert_timeframe(window[-1])  # day, week, month, year
-            timeframe = convert_timeframe(_var[3])  # day, week, month, year
-            timedelta = to_int(_var[4][-1])  # 1
-            endtime = timedelta
-
-            if window_inc is None or window_dur is None or timeframe is None or timedelta is None:
-                return
-
-            if self.execute_debug:
-                self.logger.debug(f"_handle_verbrauch: '{func}' function detected. {window=}, {timeframe=}, {timedelta=}")
-
-            if window_dur in ['day', 'week', 'month', 'year']:
-                starttime = convert_duration(timeframe, window_dur) * window_inc
-                return consumption_calc(c_start=starttime, c_end=endtime)
-
-        # handle all functions of format 'verbrauch_timeframe_timedelta' like 'verbrauch_jahreszeitraum_minus1'
-        elif len(_var) == 3 and _var[1] == 'jahreszeitraum' and _var[2].startswith('minus'):
-            timeframe = convert_timeframe(_var[1])  # day, week, month, year
-            timedelta = to_int(_var[2][-1])  # 1 oder 2 oder 3
-            if timedelta is None or timeframe is None:
+        # handle all functions 'verbrauch' in format 'verbrauch_timeframe_timedelta' like 'verbrauch_heute_minus2' and 'verbrauch_jahreszeitraum_minus1'
+        elif not db_addon_fct.startswith('serie_'):
+            _range = get_counter_reading_range(db_addon_fct, today=self._get_calendar()['today'])
+            if _range is None:
+                self.logger.info(f"_handle_verbrauch: No adequate function for {db_addon_fct=} found.")
                 return
+            timeframe, c_start, c_end = _range
 
             if self.execute_debug:
-                self.logger.debug(f"_handle_verbrauch: '{db_addon_fct}' function detected. {timeframe=}, {timedelta=}")
-
-            today = datetime.date.today()
-            year = today.year - timedelta
-            start_date = datetime.date(year, 1, 1) - relativedelta(days=1)  # Start ist Tag vor dem 1.1., damit Abfrage den Maximalwert von 31.12. 00:00:00 bis 1.1. 00:00:00 ergibt
-            end_date = today - relativedelta(years=timedelta)
-            start = (today - start_date).days
-            end = (today - end_date).days
+                self.logger.debug(f"_handle_verbrauch: '{db_addon_fct}' function detected. {timeframe=}, {c_start=}, {c_end=}")
 
-            return consumption_calc(c_start=start, c_end=end)
+            return consumption_calc(c_start=c_start, c_end=c_end)
 
         # handle all functions of format 'serie_verbrauch_timeframe_countgroup' like 'serie_verbrauch_tag_30d'
-        elif db_addon_fct.startswith('serie_') and len(_var) == 4:
+        elif len(_var) == 4:
             self.logger.debug(f"_handle_verbrauch serie reached")
             func = 'diff_max'
             timeframe = convert_timeframe(_var[2])
@@ -1270,7 +1802,7 @@ class DatabaseAddOn(SmartPlugin):
             if self.execute_debug:
                 self.logger.debug(f"_handle_verbrauch: 'serie_verbrauch_timeframe_countgroup' function detected. {query_params=}")
 
-            return self._query_item(**query_params)
+            return self._query_serie(db_addon_fct, **query_params)
 
         else:
             self.logger.info(f"_handle_verbrauch: No adequate function for {db_addon_fct=} found.")
@@ -1389,26 +1921,15 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_kaeltesumme: Year for item={database_item.path()} was {year}. This is not a valid year. Query cancelled.")
             return
 
-        # define year
-        if year == 'current':
-            if datetime.date.today() < datetime.date(int(datetime.date.today().year), 9, 21):
-                year = datetime.date.today().year - 1
-            else:
-                year = datetime.date.today().year
-
-        # define start_date and end_date
-        if month is None:
-            start_date = datetime.date(int(year), 9, 21)
-            end_date = datetime.date(int(year) + 1, 3, 22)
-        elif valid_month(month):
-            start_date = datetime.date(int(year), int(month), 1)
-            end_date = start_date + relativedelta(months=+1) - datetime.timedelta(days=1)
-        else:
+        # define start_date, end_date
+        period = get_temperature_sum_period('kaeltesumme', year, month, today=self._get_calendar()['today'])
+        if period is None:
             self.logger.error(f"_handle_kaeltesumme: Month for item={database_item.path()} was {month}. This is not a valid month. Query cancelled.")
             return
+        start_date, end_date = period
 
         # define start / end
-        today = datetime.date.today()
+        today = self._get_calendar()['today']
         if start_date > today:
             self.logger.error(f"_handle_kaeltesumme: Start time for query of item={database_item.path()} is in future. Query cancelled.")
             return
@@ -1419,22 +1940,10 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_kaeltesumme: End time for query of item={database_item.path()} is before start time. Query cancelled.")
             return
 
-        # get raw data as list
-        self.logger.debug("_handle_kaeltesumme: Try to get raw data")
-        raw_data = self._prepare_temperature_list(database_item=database_item, start=start, end=end, version='raw')
-        if self.execute_debug:
-            self.logger.debug(f"_handle_kaeltesumme: raw_value_list={raw_data=}")
-
-        # calculate value
-        if raw_data and isinstance(raw_data, list):
-            if raw_data == [[None, None]]:
-                return
-
-            # akkumulieren alle negativen Werte
-            ks = 0
-            for entry in raw_data:
-                if entry[1] < 0:
-                    ks -= entry[1]
+        # get sum of all negative daily average temperatures
+        key = get_temperature_sum_key(database_item, 'kaeltesumme', year, month)
+        ks = self._get_temperature_sum(database_item, key, start_date, end_date, lambda entry: -entry[1] if entry[1] < 0 else 0)
+        if ks is not None:
             return int(round(ks, 0))
 
     def _handle_waermesumme(self, database_item: Item, year: Union[int, str], month: Union[int, str] = None, threshold: int = 0) -> Union[int, None]:
@@ -1455,23 +1964,15 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_waermesumme: Year for item={database_item.path()} was {year}. This is not a valid year. Query cancelled.")
             return
 
-        # define year
-        if year == 'current':
-            year = datetime.date.today().year
-
         # define start_date, end_date
-        if month is None:
-            start_date = datetime.date(int(year), 1, 1)
-            end_date = datetime.date(int(year), 9, 21)
-        elif valid_month(month):
-            start_date = datetime.date(int(year), int(month), 1)
-            end_date = start_date + relativedelta(months=+1) - datetime.timedelta(days=1)
-        else:
+        period = get_temperature_sum_period('waermesumme', year, month, today=self._get_calendar()['today'])
+        if period is None:
             self.logger.error(f"_handle_waermesumme: Month for item={database_item.path()} was {month}. This is not a valid month. Query cancelled.")
             return
+        start_date, end_date = period
 
         # check start_date
-        today = datetime.date.today()
+        today = self._get_calendar()['today']
         if start_date > today:
             self.logger.info(f"_handle_waermesumme: Start time for query of item={database_item.path()} is in future. Query cancelled.")
             return
@@ -1485,24 +1986,13 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_waermesumme: End time for query of item={database_item.path()} is before start time. Query cancelled.")
             return
 
-        # get raw data as list
-        raw_data = self._prepare_temperature_list(database_item=database_item, start=start, end=end, version='raw')
-        if self.execute_debug:
-            self.logger.debug(f"_handle_waermesumme: raw_value_list={raw_data=}")
-
         # set threshold to min 0
         threshold = min(0, threshold)
 
-        # calculate value
-        if raw_data and isinstance(raw_data, list):
-            if raw_data == [[None, None]]:
-                return
-
-            # akkumulieren alle Werte, größer/gleich Schwellenwert
-            ws = 0
-            for entry in raw_data:
-                if entry[1] >= threshold:
-                    ws += entry[1]
+        # get sum of all daily average temperatures, größer/gleich Schwellenwert
+        key = get_temperature_sum_key(database_item, 'waermesumme', year, month, threshold)
+        ws = self._get_temperature_sum(database_item, key, start_date, end_date, lambda entry: entry[1] if entry[1] >= threshold else 0)
+        if ws is not None:
             return int(round(ws, 0))
 
     def _handle_gruenlandtemperatursumme(self, database_item: Item, year: Union[int, str]) -> Union[int, None]:
@@ -1519,16 +2009,15 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_gruenlandtemperatursumme: Year for item={database_item.path()} was {year}. This is not a valid year. Query cancelled.")
             return
 
-        # define year
-        if year == 'current':
-            year = datetime.date.today().year
-
         # define start_date, end_date
-        start_date = datetime.date(int(year), 1, 1)
-        end_date = datetime.date(int(year), 9, 21)
+        period = get_temperature_sum_period('gruenlandtempsumme', year, today=self._get_calendar()['today'])
+        if period is None:
+            self.logger.error(f"_handle_gruenlandtemperatursumme: Period for item={database_item.path()} with {year=} could not be defined. Query cancelled.")
+            return
+        start_date, end_date = period
 
         # check start_date
-        today = datetime.date.today()
+        today = self._get_calendar()['today']
         if start_date > today:
             self.logger.info(f"_handle_gruenlandtemperatursumme: Start time for query of item={database_item.path()} is in future. Query cancelled.")
             return
@@ -1542,30 +2031,24 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_gruenlandtemperatursumme: End time for query of item={database_item.path()} is before start time. Query cancelled.")
             return
 
-        # get raw data as list
-        raw_data = self._prepare_temperature_list(database_item=database_item, start=start, end=end, version='raw')
-        if self.execute_debug:
-            self.logger.debug(f"_handle_gruenlandtemperatursumme: raw_value_list={raw_data}")
-
-        # calculate value
-        if raw_data and isinstance(raw_data, list):
-            if raw_data == [[None, None]]:
-                return
-
-            # akkumulieren alle Werte, größer/gleich Schwellenwert, im Januar gewichtet mit 50%, im Februar mit 75%
-            try:
-                gts = 0
-                for entry in raw_data:
-                    timestamp, value = entry
-                    dt = datetime.datetime.fromtimestamp(timestamp / 1000)
-                    if dt.month == 1:
-                        value = value * 0.5
-                    elif dt.month == 2:
-                        value = value * 0.75
-                    gts += value
+        def _contribution(entry) -> float:
+            """Wert des Tages, im Januar gewichtet mit 50%, im Februar mit 75%"""
+            timestamp, value = entry
+            month = datetime.datetime.utcfromtimestamp(timestamp).month
+            if month == 1:
+                return value * 0.5
+            elif month == 2:
+                return value * 0.75
+            return value
+
+        # get sum of all daily average temperatures
+        try:
+            key = get_temperature_sum_key(database_item, 'gruenlandtempsumme', year)
+            gts = self._get_temperature_sum(database_item, key, start_date, end_date, _contribution)
+            if gts is not None:
                 return int(round(gts, 0))
-            except Exception as e:
-                self.logger.error(f"Error {e} occurred during calculation of gruenlandtemperatursumme with {raw_data=} for {database_item.path()=}")
+        except Exception as e:
+            self.logger.error(f"Error {e} occurred during calculation of gruenlandtemperatursumme for {database_item.path()=}")
 
     def _handle_wachstumsgradtage(self, database_item: Item, year: Union[int, str], method: int = 0, threshold: int = 10):
         """
@@ -1582,16 +2065,15 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_wachstumsgradtage: Year for item={database_item.path()} was {year}. This is not a valid year. Query cancelled.")
             return
 
-        # define year
-        if year == 'current':
-            year = datetime.date.today().year
-
         # define start_date, end_date
-        start_date = datetime.date(int(year), 1, 1)
-        end_date = datetime.date(int(year), 9, 21)
+        period = get_temperature_sum_period('wachstumsgradtage', year, today=self._get_calendar()['today'])
+        if period is None:
+            self.logger.error(f"_handle_wachstumsgradtage: Period for item={database_item.path()} with {year=} could not be defined. Query cancelled.")
+            return
+        start_date, end_date = period
 
         # check start_date
-        today = datetime.date.today()
+        today = self._get_calendar()['today']
         if start_date > today:
             self.logger.info(f"_handle_wachstumsgradtage: Start time for query of item={database_item.path()} is in future. Query cancelled.")
             return
@@ -1605,51 +2087,210 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.error(f"_handle_wachstumsgradtage: End time for query of item={database_item.path()} is before start time. Query cancelled.")
             return
 
+        # get sum for scalar methods from accumulator
+        if method == 0 or method == 1:
+            if method == 0:
+                self.logger.info(f"Caluclate 'Wachstumsgradtag' according to 'Berechnung des einfachen Durchschnitts'.")
+            else:
+                self.logger.info(f"Caluclate 'Wachstumsgradtag' according to 'Modifizierte Berechnung des einfachen Durchschnitts'.")
+            key = get_temperature_sum_key(database_item, 'wachstumsgradtage', year, threshold=threshold, method=method)
+            wgte = self._get_temperature_sum(database_item, key, start_date, end_date, lambda entry: max(0, get_wachstumsgradtag(entry[1], entry[2], threshold, method)), version='minmax')
+            if wgte is not None:
+                return int(round(wgte, 0))
+            return
+
         # get raw data as list
         raw_data = self._prepare_temperature_list(database_item=database_item, start=start, end=end, version='minmax')
         if self.execute_debug:
             self.logger.debug(f"_handle_wachstumsgradtage: raw_value_list={raw_data}")
 
         # calculate value
-        if raw_data and isinstance(raw_data, list):
-            if raw_data == [[None, None]]:
-                return
+        if raw_data is None:
+            return
 
         # Die Berechnung des einfachen Durchschnitts // akkumuliere positive Differenz aus Mittelwert aus Tagesminimaltemperatur und Tagesmaximaltemperatur limitiert auf 30°C und Schwellenwert
         wgte = 0
         wgte_list = []
-        if method == 0 or method == 10:
+        if method == 10:
             self.logger.info(f"Caluclate 'Wachstumsgradtag' according to 'Berechnung des einfachen Durchschnitts'.")
             for entry in raw_data:
                 timestamp, min_val, max_val = entry
-                wgt = (((min_val + min(30, max_val)) / 2) - threshold)
+                wgt = get_wachstumsgradtag(min_val, max_val, threshold, method)
                 if wgt > 0:
                     wgte += wgt
                 wgte_list.append([timestamp, int(round(wgte, 0))])
-            if method == 0:
-                return int(round(wgte, 0))
-            else:
-                return wgte_list
+            return wgte_list
 
         # Die modifizierte Berechnung des einfachen Durchschnitts. // akkumuliere positive Differenz aus Mittelwert aus Tagesminimaltemperatur mit mind Schwellentemperatur und Tagesmaximaltemperatur limitiert auf 30°C und Schwellenwert
-        elif method == 1 or method == 11:
+        elif method == 11:
             self.logger.info(f"Caluclate 'Wachstumsgradtag' according to 'Modifizierte Berechnung des einfachen Durchschnitts'.")
             for entry in raw_data:
                 timestamp, min_val, max_val = entry
-                wgt = (((max(threshold, min_val) + min(30.0, max_val)) / 2) - threshold)
+                wgt = get_wachstumsgradtag(min_val, max_val, threshold, method)
                 if wgt > 0:
                     wgte += wgt
                 wgte_list.append([timestamp, int(round(wgte, 0))])
-            if method == 1:
-                return int(round(wgte, 0))
-            else:
-                return wgte_list
+            return wgte_list
         else:
             self.logger.info(f"Method for 'Wachstumsgradtag' calculation not defined.'")
 
+    def _get_temperature_sum(self, database_item: Item, key: str, start_date: datetime.date, end_date: datetime.date, contribution, version: str = 'raw') -> Union[float, None]:
+        """
+        Get sum of daily contributions of temperature list from start_date to end_date (both included).
+        Contributions of closed days are accumulated persistently per key, so that just the days since last run and the current day will be queried.
+        The accumulator is reset, if start_date changed or entries of the database item within the time range were deleted.
+
+        :param database_item: item object for which the query should be done
+        :param key: key of accumulator, defined by function and its parameters
+        :param start_date: first day of sum
+        :param end_date: last day of sum
+        :param contribution: function returning contribution of a day based on entry of temperature list
+        :param version: version of temperature list ('raw' or 'minmax')
+
+        :return: sum of contributions; None for errors
+        """
+
+        today = self._get_calendar()['today']
+
+        # reference calculation: sum contributions of complete period without accumulator
+        if self._is_reference_calculation():
+            temp_list = self._prepare_temperature_list(database_item=database_item, start=(today - start_date).days, end=max((today - end_date).days, 0), version=version)
+            if temp_list is None:
+                return
+            ts_start = datetime_to_timestamp(datetime.datetime.combine(start_date, datetime.time()))
+            ts_end = datetime_to_timestamp(datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time()))
+            return sum(contribution(entry) for entry in temp_list if ts_start <= entry[0] < ts_end)
+
+        oldest_log = self._get_oldest_log(database_item)
+        acc = self._get_temperature_accumulator(database_item, key, start_date)
+        if acc is None:
+            return
+        accumulators = self.persistent_data.setdefault('temperature_sums', {})
+
+        # add contributions of days closed since last run
+        until = datetime.date.fromisoformat(acc['until'])
+        closed_end = min(end_date + datetime.timedelta(days=1), today)
+        if until < closed_end:
+            ts_until = datetime_to_timestamp(datetime.datetime.combine(until, datetime.time()))
+            temp_list = self._prepare_temperature_list(database_item=database_item, start=(today - until).days, end=(today - closed_end).days + 1, version=version)
+            if temp_list is None:
+                return
+            acc['sum'] += sum(contribution(entry) for entry in temp_list if entry[0] >= ts_until)
+            acc['until'] = closed_end.isoformat()
+            acc['oldest_log'] = oldest_log
+
+            if self.prepare_debug:
+                self.logger.debug(f"_get_temperature_sum: Accumulator for {key=} updated until {closed_end} to {acc['sum']}")
+
+        accumulators[key] = acc
+
+        # add contribution of current day
+        _sum = acc['sum']
+        if start_date <= today <= end_date:
+            ts_today = datetime_to_timestamp(datetime.datetime.combine(today, datetime.time()))
+            temp_list = self._prepare_temperature_list(database_item=database_item, start=0, end=0, version=version)
+            if temp_list is None:
+                return
+            _sum += sum(contribution(entry) for entry in temp_list if entry[0] >= ts_today)
+
+        return _sum
+
+    def _get_temperature_accumulator(self, database_item: Item, key: str, start_date: datetime.date) -> Union[dict, None]:
+        """
+        Get accumulator of temperature sum from persistent data; new accumulator, if none exists or it is not valid anymore
+        (start_date changed, accumulated until a future day or entries of the database item within the time range deleted)
+
+        :param database_item: item object of temperature sum
+        :param key: key of accumulator
+        :param start_date: first day of sum
+
+        :return: dict like {'start_date': first day, 'until': first day not accumulated, 'oldest_log': oldest log, 'sum': sum}; None for errors
+        """
+
+        today = self._get_calendar()['today']
+        oldest_log = self._get_oldest_log(database_item)
+        if oldest_log is None:
+            return
+
+        ts_start_date = datetime_to_timestamp(datetime.datetime.combine(start_date, datetime.time())) * 1000
+        acc = self.persistent_data.get('temperature_sums', {}).get(key)
+
+        if not acc or acc['start_date'] != start_date.isoformat() or acc['until'] > today.isoformat() or (acc['oldest_log'] != oldest_log and oldest_log > ts_start_date):
+            if self.prepare_debug:
+                self.logger.debug(f"_get_temperature_accumulator: Accumulator for {key=} will be created.")
+            acc = {'start_date': start_date.isoformat(), 'until': start_date.isoformat(), 'oldest_log': oldest_log, 'sum': 0}
+
+        return acc
+
+    def _get_pending_temperature_day(self, database_item: Item, db_addon_fct: str, params: dict) -> Union[datetime.date, None]:
+        """
+        Get first day of daily temperatures still needed by temperature sum item: day from which accumulator is missing, first
+        day of period for functions without accumulator; not prior to oldest log of database item
+
+        :param database_item: item object of temperature sum
+        :param db_addon_fct: kaeltesumme, waermesumme, gruenlandtempsumme or wachstumsgradtage
+        :param params: db_addon_params of item
+
+        :return: first needed day; None, if no daily temperatures are needed
+        """
+
+        today = self._get_calendar()['today']
+        year = params.get('year', 'current')
+        period = get_temperature_sum_period(db_addon_fct, year, params.get('month'), today=self._get_calendar()['today'])
+        if period is None or period[0] > today:
+            return
+        start_date, end_date = period
+
+        if db_addon_fct == 'wachstumsgradtage' and params.get('method', 0) not in [0, 1]:
+            first_day = start_date
+        else:
+            key = get_temperature_sum_key(database_item, db_addon_fct, year, params.get('month'), params.get('threshold'), params.get('method'))
+            acc = self._get_temperature_accumulator(database_item, key, start_date)
+            if acc is None:
+                return
+            first_day = datetime.date.fromisoformat(acc['until'])
+            if first_day > end_date:
+                return
+
+        oldest_log = self._get_oldest_log(database_item)
+        return max(first_day, datetime.datetime.utcfromtimestamp(oldest_log / 1000).date())
+
     def _prepare_temperature_list(self, database_item: Item, start: int, end: int = 0, ignore_value=None, version: str = 'hour') -> list:
+        """
+        Get prepared temperature list from run cache or create it and put it to run cache, so that it is created once per
+        calculation run per database item, date range, ignore_value and version, no matter how many items depend on it.
+
+        :param database_item: item object for which the query should be done
+        :param start: first day given in days before today
+        :param end: last day given in days before today
+        :param ignore_value: value of val_num, which will be ignored during query
+        :param version: 'hour' (daily average of hourly averages), 'raw' (daily average of first value per hour), 'minmax' (daily min and max)
+
+        :return: list of list like [[timestamp, value], ...] or [[timestamp, min value, max value], ...]; None for errors
+        """
+
+        if self._is_reference_calculation():
+            return self._create_temperature_list(database_item, start, end, ignore_value, version)
+
+        today = self._get_calendar()['today']
+        key = ('temperature_list', database_item, today - datetime.timedelta(days=start), today - datetime.timedelta(days=end), ignore_value, version)
+
+        cached = self.run_cache.get(key)
+        if cached and time.time() - cached['created'] <= RUN_CACHE_TTL:
+            self.run_cache_stats['hits'] += 1
+            if self.prepare_debug:
+                self.logger.debug(f"_prepare_temperature_list: Temperature list for {key=} taken from run cache.")
+            return cached['list']
+
+        self.run_cache_stats['misses'] += 1
+        temp_list = self._create_temperature_list(database_item, start, end, ignore_value, version)
+        if temp_list is not None:
+            self.run_cache[key] = {'created': time.time(), 'list': temp_list}
+        return temp_list
 
-        self.logger.debug(f"_prepare_temperature_list called with {database_item=}, {start=}, {end=}, {ignore_value=}, {version=}")
+    def _create_temperature_list(self, database_item: Item, start: int, end: int = 0, ignore_value=None, version: str = 'hour') -> list:
+
+        self.logger.debug(f"_create_temperature_list called with {database_item=}, {start=}, {end=}, {ignore_value=}, {version=}")
 
         def _create_temp_dict() -> dict:
             """create dict based on database query result like {'date1': {'hour1': [temp values], 'hour2': [temp values], ...}, 'date2': {'hour1': [temp values], 'hour2': [temp values], ...}, ...}"""
@@ -1718,16 +2359,29 @@ class DatabaseAddOn(SmartPlugin):
             self.logger.debug(f"{temp_list=}")
             return temp_list
 
-        elif version == 'raw':
+        elif version in ['raw', 'minmax'] and self._is_reference_calculation():
+            # reference calculation: query raw values instead of using daily temperature summary of run
             raw_value_list = self._query_item(func='raw', item=database_item, timeframe='day', start=start, end=end, ignore_value=ignore_value)
-            self.logger.debug(f"{raw_value_list=}")
+            if raw_value_list == [[None, None]]:
+                return
+            raw_value_list = [entry for entry in raw_value_list if entry[0]]
 
             # create nested dict with temps
             temp_dict = _create_temp_dict()
-            self.logger.debug(f"raw: {temp_dict=}")
 
-            # calculate 'tagesdurchschnitt' and create list of list like database query response
+            # create list of list like database query response
+            if version == 'minmax':
+                return _create_list_timestamp_minmaxtemp()
             _calculate_hourly_average()
+            return _create_list_timestamp_avgtemp()
+
+        elif version == 'raw':
+            summary = self._get_daily_temperature_summary(database_item, start, end, ignore_value)
+            if summary is None:
+                return
+
+            # create nested dict with first temp of each hour as 'stundenwert'
+            temp_dict = {_date: {hour: [value] for hour, value in summary[_date]['hours'].items()} for _date in summary}
             self.logger.debug(f"raw: {temp_dict=}")
 
             # create list of list like database query response
@@ -1736,21 +2390,135 @@ class DatabaseAddOn(SmartPlugin):
             return temp_list
 
         elif version == 'minmax':
-            raw_value_list = self._query_item(func='raw', item=database_item, timeframe='day', start=start, end=end, ignore_value=ignore_value)
-            self.logger.debug(f"{raw_value_list=}")
-
-            # create nested dict with temps
-            temp_dict = _create_temp_dict()
-            self.logger.debug(f"raw: {temp_dict=}")
+            summary = self._get_daily_temperature_summary(database_item, start, end, ignore_value)
+            if summary is None:
+                return
 
             # create list of list like database query response
-            temp_list = _create_list_timestamp_minmaxtemp()
+            temp_list = [[datetime_to_timestamp(datetime.datetime.strptime(_date, '%Y-%m-%d')), summary[_date]['min'], summary[_date]['max']] for _date in summary]
             self.logger.debug(f"{temp_list=}")
             return temp_list
 
         else:
             return []
 
+    def _get_daily_temperature_summary(self, database_item: Item, start: int, end: int = 0, ignore_value=None) -> Union[dict, None]:
+        """
+        Get summary of raw temperatures per day (first value of each hour, min and max value of day) for days from start to end.
+        Summary is kept in run cache, so that all items of a calculation run using the database item share one query;
+        the query covers the range registered by the recalculation plan for the database item.
+
+        :param database_item: item object for which the query should be done
+        :param start: first day given in days before today
+        :param end: last day given in days before today
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: dict like {'date': {'hours': {'hour': first value}, 'min': min value, 'max': max value}}; None for errors
+        """
+
+        today = self._get_calendar()['today']
+        first_date = today - datetime.timedelta(days=start)
+        last_date = today - datetime.timedelta(days=end)
+        key = ('temperature_summary', database_item, ignore_value)
+
+        cached = self.run_cache.get(key)
+        if not cached or time.time() - cached['created'] > RUN_CACHE_TTL or cached['first_date'] > first_date or cached['last_date'] < last_date:
+            _first_date = min(first_date, self.run_cache.get(('temperature_range', database_item), first_date))
+            _last_date = max(last_date, today if self.run_cache.get(('temperature_range', database_item)) else last_date)
+            days = {}
+
+            def _add_row(row):
+                timestamp, value = row[0], row[1]
+                if not timestamp or value is None:
+                    return
+                value = round(value, 1)
+                dt = datetime.datetime.utcfromtimestamp(timestamp / 1000)
+                day = days.setdefault(dt.strftime('%Y-%m-%d'), {'hours': {}, 'min': value, 'max': value})
+                day['hours'].setdefault(dt.strftime('%H'), value)
+                day['min'] = min(day['min'], value)
+                day['max'] = max(day['max'], value)
+
+            # raw values are streamed into local summary, so that memory is bounded by number of days instead of number of log entries;
+            # summary is put to run cache just if query succeeded, days of an interrupted query (e.g. timeout) are dropped
+            if self._query_item(func='raw', item=database_item, timeframe='day', start=(today - _first_date).days, end=(today - _last_date).days, ignore_value=ignore_value, row_handler=_add_row) == [[None, None]]:
+                return
+
+            cached = {'created': time.time(), 'first_date': _first_date, 'last_date': _last_date, 'days': days}
+            self.run_cache[key] = cached
+
+            if self.prepare_debug:
+                self.logger.debug(f"_get_daily_temperature_summary: Summary of {len(days)} days from {_first_date} to {_last_date} for item={database_item.path()} created.")
+
+        _first, _last = first_date.isoformat(), last_date.isoformat()
+        return {_date: day for _date, day in cached['days'].items() if _first <= _date <= _last}
+
+    def _create_recalc_plan(self, items: list) -> list:
+        """
+        Create plan for calculation run: Items sharing an intermediate result of their database item (daily temperatures,
+        counter readings, cumulative consumption) are ordered consecutively and the range of the intermediate result is
+        registered, so that it is queried once for all dependent items of the run. For daily temperatures, just the days
+        missing in the accumulators of the temperature sums are registered, not prior to oldest log of the database item.
+        Run cache and calendar are created for a new run; items planned while a run is in progress are added to that run
+        (unless the day changed in the meantime), so that the items already in queue keep their run cache and calendar.
+
+        :param items: list of items to be calculated
+        :return: ordered list of items
+        """
+
+        if not self._run_in_progress() or self.calendar is None or self.calendar['today'] != datetime.date.today():
+            self.run_cache = {}
+            self.calendar = create_calendar()
+
+        nodes = {}
+        _items = []
+        for item in items:
+            item_config = self.get_item_config(item)
+            db_addon_fct = item_config.get('db_addon_fct')
+            database_item = item_config.get('database_item')
+            intermediate = get_intermediate(db_addon_fct)
+            if intermediate is None or not isinstance(database_item, Item):
+                _items.append(item)
+                continue
+
+            nodes.setdefault((database_item, intermediate), []).append(item)
+
+            # register range of daily temperatures still missing in accumulators
+            if intermediate == 'temperature':
+                first_day = self._get_pending_temperature_day(database_item, db_addon_fct, item_config.get('params') or {})
+                if first_day:
+                    _key = ('temperature_range', database_item)
+                    self.run_cache[_key] = min(first_day, self.run_cache.get(_key, first_day))
+
+        if self.execute_debug:
+            self.logger.debug(f"_create_recalc_plan: {len(nodes)} shared intermediate results for {sum(len(dependents) for dependents in nodes.values())} items; {len(_items)} items without shared intermediate result.")
+
+        return [item for dependents in nodes.values() for item in dependents] + _items
+
+    def _run_in_progress(self) -> bool:
+        """
+        Check if calculation run is in progress, meaning on-demand items are in queue or being calculated
+
+        :return: True, if run is in progress
+        """
+
+        with self.item_queue.mutex:
+            pending = any(not isinstance(entry, (tuple, str)) for entry in self.item_queue.queue)
+        return pending or self._ondemand_in_progress
+
+    def _get_calendar(self) -> types.MappingProxyType:
+        """
+        Get calendar snapshot of current calculation run; snapshot is created at start of run or at first use and dropped if
+        worker is idle, so that all items of one run share the same 'today'. Outside of a run (public functions, on-change
+        items), a snapshot of a previous day is replaced.
+
+        :return: calendar snapshot
+        """
+
+        calendar = self.calendar
+        if calendar is None or (calendar['today'] != datetime.date.today() and not self._run_in_progress()):
+            calendar = self.calendar = create_calendar()
+        return calendar
+
     def _create_due_items(self) -> list:
         """
         Create set of items which are due and resets cache dicts
@@ -1838,22 +2606,27 @@ class DatabaseAddOn(SmartPlugin):
         else:
             return True
 
-    def _initialize_db(self) -> bool:
+    def _initialize_db(self, db=None) -> bool:
         """
         Initializes database connection
 
+        :param db: database object to be initialized (default = None, meaning database object of main connection)
         :return: Status of initialization
         """
 
+        if db is None:
+            db = self._db
+
         try:
-            if not self._db.connected():
+            if not db.connected():
                 # limit connection requests to 20 seconds.
                 current_time = time.time()
                 time_delta_last_connect = current_time - self.last_connect_time
                 # self.logger.debug(f"DEBUG: delta {time_delta_last_connect}")
                 if time_delta_last_connect > 20:
                     self.last_connect_time = time.time()
-                    self._db.connect()
+                    self.db_connect_count += 1
+                    db.connect()
                 else:
                     self.logger.error(f"_initialize_db: Database reconnect suppressed: Delta time: {time_delta_last_connect}")
                     return False
@@ -1863,6 +2636,151 @@ class DatabaseAddOn(SmartPlugin):
         else:
             return True
 
+    def _init_read_connection(self) -> bool:
+        """
+        Open separate read-only connection to sqlite database for heavy read queries (serie, raw), so that these queries
+        run in parallel to the writer of database plugin. Connection is just used for databases in WAL mode, since in
+        other journal modes readers still block the writer.
+
+        :return: Status of read-only connection
+        """
+
+        journal_mode = self._fetchone('PRAGMA journal_mode')
+        if not journal_mode or str(journal_mode[0]).lower() != 'wal':
+            self.logger.info(f"SQLite database is not in WAL mode (journal_mode={journal_mode[0] if journal_mode else None}). Read queries will use connection of database plugin.")
+            return False
+
+        connection_data = []
+        for entry in self.connection_data:
+            key, _, value = str(entry).partition(':')
+            if key.strip() == 'database':
+                value = os.path.abspath(value.strip())
+                entry = f"database:file:{value}?mode=ro"
+            elif key.strip() in ('uri', 'check_same_thread'):
+                continue
+            connection_data.append(entry)
+        connection_data.extend(['uri:True', 'check_same_thread:0'])
+
+        try:
+            db_read = lib.db.Database("DatabaseAddOnRead", self.db_driver, connection_data)
+            if not db_read.api_initialized:
+                raise Exception('database API could not be initialized')
+            self.db_connect_count += 1
+            db_read.connect()
+            for pragma, value in SQLITE_READ_PRAGMAS.items():
+                self._execute(f"PRAGMA {pragma} = {value}", db=db_read)
+        except Exception as e:
+            self.logger.warning(f"Read-only connection to SQLite database could not be opened: {e}. Read queries will use connection of database plugin.")
+            return False
+
+        self._db_read = db_read
+        self.logger.info(f"Read-only connection to SQLite database opened with {SQLITE_READ_PRAGMAS}.")
+        return True
+
+    def _init_replica_connection(self) -> bool:
+        """
+        Open connection to mysql replica for read queries of log table
+
+        :return: Status of replica connection
+        """
+
+        try:
+            db_read = lib.db.Database("DatabaseAddOnReplica", self.db_driver, self.replica_connect)
+            if not db_read.api_initialized:
+                raise Exception('database API could not be initialized')
+            self.db_connect_count += 1
+            db_read.connect()
+        except Exception as e:
+            self.logger.warning(f"Connection to replica could not be opened: {e}. Read queries will use primary database.")
+            return False
+
+        self._db_read = db_read
+        self._replica_checked = 0
+        self._update_replica_lag()
+        self.logger.info(f"Connection to replica opened; replication lag is {self.replica_lag}s. Read queries of log table will use replica as long as lag is below {self.replica_max_lag}s.")
+        return True
+
+    def _update_replica_lag(self) -> None:
+        """
+        Read replication lag of mysql replica and decide if replica is used for read queries; replica will not be used, if
+        lag exceeds parameter 'replica_max_lag' or replication is not running. Check is done at most every REPLICA_CHECK_INTERVAL seconds.
+        """
+
+        now = time.time()
+        if now - self._replica_checked < REPLICA_CHECK_INTERVAL:
+            return
+        self._replica_checked = now
+
+        lag = self._get_replica_lag()
+        usable = lag is not None and lag <= self.replica_max_lag
+        if usable != self._replica_usable:
+            if usable:
+                self.logger.info(f"Replication lag of replica is {lag}s. Read queries will use replica.")
+            else:
+                self.logger.warning(f"Replication lag of replica is {lag}s and exceeds limit of {self.replica_max_lag}s or replication is not running. Read queries will use primary database.")
+
+        self.replica_lag = lag
+        self._replica_usable = usable
+
+    def _get_replica_lag(self) -> Union[int, None]:
+        """
+        Query replication lag of replica (Seconds_Behind_Source / Seconds_Behind_Master)
+
+        :return: lag in seconds; None, if replication is not running or status could not be read
+        """
+
+        def _status(_query, _params, cur=None):
+            cur = self._db_read.cursor()
+            try:
+                self._db_read.execute(_query, _params, cur=cur)
+                row = cur.fetchone()
+                columns = [column[0] for column in cur.description] if cur.description else []
+            finally:
+                cur.close()
+            return dict(zip(columns, row)) if row else {}
+
+        status = None
+        for query in ([self._replica_status_query] if self._replica_status_query else ['SHOW REPLICA STATUS', 'SHOW SLAVE STATUS']):
+            status = self._query(_status, query, db=self._db_read)
+            if status is not None:
+                self._replica_status_query = query
+                break
+
+        if not status:
+            return
+        return to_int(status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master')))
+
+    def _get_read_db(self):
+        """
+        Get database object for heavy read queries; falls back to main connection, if read-only connection is not available
+        or replication lag of replica is too high
+
+        :return: database object
+        """
+
+        if self._db_read is None or not self._initialize_db(self._db_read):
+            return self._db
+
+        if self.db_driver.lower() == 'pymysql':
+            self._update_replica_lag()
+            if not self._replica_usable:
+                return self._db
+
+        return self._db_read
+
+    def read_connection_status(self) -> str:
+        """
+        Get status of connection for read queries for web interface
+
+        :return: status string
+        """
+
+        if self._db_read is None:
+            return '-'
+        if self.db_driver.lower() == 'sqlite3':
+            return 'SQLite read-only'
+        return f"Replica ({'aktiv' if self._replica_usable else 'Primary'}, {self.replica_lag if self.replica_lag is not None else '-'}s)"
+
     def _check_db_connection_setting(self) -> None:
         """
         Check Setting of DB connection for stable use.
@@ -1881,6 +2799,107 @@ class DatabaseAddOn(SmartPlugin):
         except Exception:
             pass
 
+    def _check_db_log_index(self) -> None:
+        """
+        Check indexes of log table for covering (item_id, time) and explain a representative query.
+        """
+
+        index_name = None
+        try:
+            for name, columns in self._get_db_log_indexes().items():
+                if columns[:2] == ['item_id', 'time']:
+                    index_name = name
+                    break
+        except Exception as e:
+            self.logger.info(f"Indexes of log table could not be read. Error was {e}.")
+
+        explain = self._explain_log_query()
+
+        self.log_index_status = {'index': index_name, 'explain': explain, 'ok': index_name is not None}
+
+        if index_name is None:
+            self.logger.warning(f"Log table has no index covering (item_id, time). Queries of plugin will be done as full table scan. Index could be created via web interface. Query plan was: {explain}")
+        else:
+            self.logger.info(f"Index {index_name!r} of log table covers (item_id, time). Query plan is: {explain}")
+
+    def create_log_index(self) -> bool:
+        """
+        Request creation of index covering (item_id, time) on log table; index is created by worker, so that caller
+        (like web interface) does not wait. State of creation is provided by log_index_creation.
+
+        :return: Status of request
+        """
+
+        if self.log_index_status.get('ok'):
+            self.logger.info(f"Index {self.log_index_status.get('index')!r} covering (item_id, time) already exists. No index created.")
+            return False
+
+        if self.log_index_creation.get('state') in ['queued', 'running']:
+            self.logger.info(f"Creation of index {LOG_INDEX_NAME!r} already requested.")
+            return False
+
+        self.log_index_creation = {'state': 'queued', 'time': self.shtime.now().strftime('%d.%m.%Y %H:%M:%S'), 'duration': None}
+        self.item_queue.put(QUEUE_CREATE_LOG_INDEX)
+        return True
+
+    def _create_log_index(self) -> bool:
+        """
+        Create index covering (item_id, time) on log table
+
+        :return: Status of index creation
+        """
+
+        if self.log_index_status.get('ok'):
+            self.log_index_creation['state'] = 'done'
+            return True
+
+        self.log_index_creation['state'] = 'running'
+        if self.db_driver.lower() == 'sqlite3':
+            self.logger.warning(f"Index {LOG_INDEX_NAME!r} on log table will be created. Database is locked for writing until index is created; log entries of database plugin will be delayed.")
+        else:
+            self.logger.warning(f"Index {LOG_INDEX_NAME!r} on log table will be created. Depending on size of table, this may take some time.")
+        _start = time.time()
+        if self._execute(f"CREATE INDEX {LOG_INDEX_NAME} ON log (item_id, time)") is None:
+            self.logger.error(f"Creation of index {LOG_INDEX_NAME!r} failed.")
+            self.log_index_creation.update({'state': 'failed', 'duration': round(time.time() - _start, 1)})
+            return False
+
+        try:
+            self._db.commit()
+        except Exception:
+            pass
+
+        self.logger.warning(f"Index {LOG_INDEX_NAME!r} on log table created within {round(time.time() - _start, 1)}s.")
+        self.log_index_creation.update({'state': 'done', 'duration': round(time.time() - _start, 1)})
+        self._check_db_log_index()
+        return True
+
+    def log_index_creation_status(self) -> str:
+        """
+        Get state of index creation for web interface
+
+        :return: state as str
+        """
+
+        if not self.log_index_creation:
+            return '-'
+        state = {'queued': 'angefordert', 'running': 'läuft', 'done': 'erstellt', 'failed': 'fehlgeschlagen'}.get(self.log_index_creation['state'])
+        duration = f" ({self.log_index_creation['duration']}s)" if self.log_index_creation.get('duration') is not None else ''
+        return f"{state} {self.log_index_creation['time']}{duration}"
+
+    def _get_database_item_state(self, item: Item) -> 'DatabaseItemState':
+        """
+        Get state record of database item from cache dict; creates empty record for unknown items
+
+        :param item: database item
+        :return: state record of database item
+        """
+
+        _state = self.item_cache.get(item)
+        if _state is None:
+            _state = self.item_cache[item] = DatabaseItemState()
+        return _state
+
     def _get_oldest_log(self, item: Item) -> int:
         """
         Get timestamp of the oldest entry of item from cache dict or get value from db and put it to cache dict
@@ -1889,20 +2908,52 @@ class DatabaseAddOn(SmartPlugin):
         :return: timestamp of the oldest log
         """
 
-        _oldest_log = self.item_cache.get(item, {}).get('oldest_log', None)
+        _oldest_log = self._get_database_item_state(item).oldest_log
+        self.cache_stats['item_cache']['misses' if _oldest_log is None else 'hits'] += 1
+
+        if _oldest_log is None:
+            _oldest_log = self._get_item_meta(item).get('oldest_log')
 
         if _oldest_log is None:
             item_id = self._get_itemid(item)
             _oldest_log = self._read_log_oldest(item_id)
-            if item not in self.item_cache:
-                self.item_cache[item] = {}
-            self.item_cache[item]['oldest_log'] = _oldest_log
+            self._get_database_item_state(item).oldest_log = _oldest_log
 
         if self.prepare_debug:
             self.logger.debug(f"_get_oldest_log for item {item.path()} = {_oldest_log}")
 
         return _oldest_log
 
+    def _get_oldest_logs(self, items: list) -> dict:
+        """
+        Get timestamp of the oldest entry of several items from cache dict or get the missing ones from db with one query and put it to cache dict
+
+        :param items: list of items, for which query should be done
+        :return: dict with item as key and timestamp of the oldest log as value
+        """
+
+        oldest_logs = {}
+        missing_items = {}
+        for item in items:
+            _oldest_log = self._get_database_item_state(item).oldest_log
+            if _oldest_log is None:
+                missing_items[item] = None
+            else:
+                oldest_logs[item] = _oldest_log
+
+        if missing_items:
+            item_ids = self._get_itemids(list(missing_items))
+            id_to_item = {item_id: item for item, item_id in item_ids.items()}
+            rows = self._read_log_oldest_items(list(id_to_item)) if id_to_item else []
+            for row in rows or []:
+                item = id_to_item.get(row[0])
+                if item is None or row[1] is None:
+                    continue
+                self._get_database_item_state(item).oldest_log = row[1]
+                oldest_logs[item] = row[1]
+
+        return oldest_logs
+
     def _get_oldest_value(self, item: Item) -> Union[int, float, bool]:
         """
         Get value of the oldest log of item from cache dict or get value from db and put it to cache dict
@@ -1911,11 +2962,12 @@ class DatabaseAddOn(SmartPlugin):
         :return: oldest value
         """
 
-        _oldest_entry = self.item_cache.get(item, {}).get('_oldest_entry', None)
+        _oldest_value = self._get_database_item_state(item).oldest_value
 
-        if _oldest_entry is not None:
-            _oldest_value = _oldest_entry[0][4]
-        else:
+        if _oldest_value is None:
+            _oldest_value = self._get_item_meta(item).get('oldest_value')
+
+        if _oldest_value is None:
             item_id = self._get_itemid(item)
             validity = False
             i = 0
@@ -1924,10 +2976,9 @@ class DatabaseAddOn(SmartPlugin):
                 oldest_entry = self._read_log_timestamp(item_id, self._get_oldest_log(item))
                 i += 1
                 if isinstance(oldest_entry, list) and isinstance(oldest_entry[0], tuple) and len(oldest_entry[0]) >= 4:
-                    if item not in self.item_cache:
-                        self.item_cache[item] = {}
-                    self.item_cache[item]['oldest_entry'] = oldest_entry
+                    self._get_database_item_state(item).oldest_entry = oldest_entry
                     _oldest_value = oldest_entry[0][4]
+                    self._get_database_item_state(item).oldest_value = _oldest_value
                     validity = True
                 elif i == 10:
                     validity = True
@@ -1947,18 +2998,46 @@ class DatabaseAddOn(SmartPlugin):
         """
 
         # self.logger.debug(f"_get_itemid called with item={item.path()}")
-        _item_id = self.item_cache.get(item, {}).get('id', None)
+        _item_id = self._get_database_item_state(item).id
+        self.cache_stats['item_cache']['misses' if _item_id is None else 'hits'] += 1
 
         if _item_id is None:
             row = self._read_item_table(item_path=str(item.path()))
             if row and len(row) > 0:
                 _item_id = int(row[0])
-                if item not in self.item_cache:
-                    self.item_cache[item] = {}
-                self.item_cache[item]['id'] = _item_id
+                self._get_database_item_state(item).id = _item_id
 
         return _item_id
 
+    def _get_itemids(self, items: list) -> dict:
+        """
+        Returns the IDs of the given items from cache dict or request the missing ones from database with one query
+
+        :param items: list of items to get the ID for
+        :return: dict with item as key and id of the item within the database as value
+        """
+
+        item_ids = {}
+        missing_items = {}
+        for item in items:
+            _item_id = self._get_database_item_state(item).id
+            if _item_id is None:
+                missing_items[str(item.path())] = item
+            else:
+                item_ids[item] = _item_id
+
+        if missing_items:
+            rows = self._read_item_table_ids(list(missing_items))
+            for row in rows or []:
+                item = missing_items.get(row[1])
+                if item is None:
+                    continue
+                _item_id = int(row[0])
+                self._get_database_item_state(item).id = _item_id
+                item_ids[item] = _item_id
+
+        return item_ids
+
     def _get_itemid_for_query(self, item: Union[Item, str, int]) -> Union[int, None]:
         """
         Get DB item id for query
@@ -1977,7 +3056,7 @@ class DatabaseAddOn(SmartPlugin):
             item_id = None
         return item_id
 
-    def _query_item(self, func: str, item: Item, timeframe: str, start: int = None, end: int = 0, group: str = None, group2: str = None, ignore_value=None) -> list:
+    def _query_item(self, func: str, item: Item, timeframe: str, start: int = None, end: int = 0, group: str = None, group2: str = None, ignore_value=None, row_handler=None) -> list:
         """
         Do diverse checks of input, and prepare query of log by getting item_id, start / end in timestamp etc.
 
@@ -1989,35 +3068,11 @@ class DatabaseAddOn(SmartPlugin):
         :param group: first grouping parameter (default = None, possible values: day, week, month, year)
         :param group2: second grouping parameter (default = None, possible values: day, week, month, year)
         :param ignore_value: value of val_num, which will be ignored during query
+        :param row_handler: function called with each row of query response; if given, rows are streamed to it instead of being returned
 
-        :return: query response / list for value pairs [[None, None]] for errors, [[0,0]] for
+        :return: query response / list for value pairs [[None, None]] for errors, [[0,0]] for; empty list if rows were streamed to row_handler
         """
 
-        def _handle_query_result(query_result) -> list:
-            """
-            Handle query result containing list
-            """
-
-            # if query delivers None, abort
-            if query_result is None:
-                # if query delivers None, abort
-                self.logger.error(f"Error occurred during _query_item. Aborting...")
-                _result = [[None, None]]
-            elif len(query_result) == 0:
-                _result = [[0, 0]]
-                self.logger.info(f" No values for item in requested timeframe in database found.")
-            else:
-                _result = []
-                for element in query_result:
-                    timestamp = element[0]
-                    value = element[1]
-                    if timestamp and value is not None:
-                        _result.append([timestamp, round(value, 1)])
-                if not _result:
-                    _result = [[None, None]]
-
-            return _result
-
         if self.prepare_debug:
             self.logger.debug(f"_query_item called with {func=}, item={item.path()}, {timeframe=}, {start=}, {end=}, {group=}, {group2=}, {ignore_value=}")
 
@@ -2049,7 +3104,7 @@ class DatabaseAddOn(SmartPlugin):
             return result
 
         # define start and end of query as timestamp in microseconds
-        ts_start, ts_end = get_start_end_as_timestamp(timeframe, start, end)
+        ts_start, ts_end = get_start_end_as_timestamp(timeframe, start, end, calendar=self._get_calendar())
         oldest_log = int(self._get_oldest_log(item))
 
         if start is None:
@@ -2072,13 +3127,519 @@ class DatabaseAddOn(SmartPlugin):
                 ts_start = oldest_log
 
         query_params = {'func': func, 'item_id': item_id, 'ts_start': ts_start, 'ts_end': ts_end, 'group': group, 'group2': group2, 'ignore_value': ignore_value}
-        result = _handle_query_result(self._query_log_timestamp(**query_params))
+        if row_handler is not None:
+            result = [[None, None]] if self._query_log_timestamp(**query_params, row_handler=row_handler) is None else []
+        else:
+            result = self._handle_query_result(self._query_log_timestamp(**query_params))
 
         if self.prepare_debug:
             self.logger.debug(f"_query_item: value for item={item.path()} with {timeframe=}, {func=}: {result}")
 
         return result
 
+    def _query_serie(self, db_addon_fct: str, func: str, item: Item, timeframe: str, start: int, end: int = 0, group: str = None, group2: str = None, ignore_value=None) -> list:
+        """
+        Get result of 'serie' function by updating the last result with the periods closed since then.
+        Query covers just the new periods (plus one for functions based on previous period like 'diff_max'); the oldest periods are dropped.
+        Full query is done, if no last result is available (startup, cache invalidation, recalc_all) or if the whole serie is outdated.
+
+        :param db_addon_fct: db_addon function of serie, used as key of cache dict together with item and ignore_value
+        :param func: function to be used at query
+        :param item: item object for which the query should be done
+        :param timeframe: time increment für definition of start, end (day, week, month, year)
+        :param start: start of serie given in x time increments
+        :param end: end of serie given in x time increments; just 0 is handled incrementally
+        :param group: first grouping parameter; just equal to timeframe is handled incrementally
+        :param group2: second grouping parameter; just None is handled incrementally
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: list of value pairs [[None, None]] for errors, [[0,0]] for no values found
+        """
+
+        query_params = {'func': func, 'item': item, 'timeframe': timeframe, 'start': start, 'end': end, 'group': group, 'group2': group2, 'ignore_value': ignore_value}
+
+        if end != 0 or group != timeframe or group2 or not isinstance(start, int) or self._is_reference_calculation():
+            return self._query_item(**query_params)
+
+        key = (item, db_addon_fct, ignore_value)
+        ts_current = get_start_end_as_timestamp(timeframe, 0, 0, calendar=self._get_calendar())[0]
+        cached = self.serie_cache.get(key)
+
+        # get number of periods closed since last result
+        periods = 0
+        if cached:
+            while periods < start and get_start_end_as_timestamp(timeframe, periods, periods, calendar=self._get_calendar())[0] > cached['ts_current']:
+                periods += 1
+
+        if not cached or periods >= start:
+            result = self._query_item(**query_params)
+        else:
+            ts_from = get_start_end_as_timestamp(timeframe, periods, periods, calendar=self._get_calendar())[0]
+            ts_serie_start = get_start_end_as_timestamp(timeframe, start, 0, calendar=self._get_calendar())[0]
+            update = self._query_item(**{**query_params, 'start': periods + 1})
+
+            if self.prepare_debug:
+                self.logger.debug(f"_query_serie: {db_addon_fct=} for item={item.path()} updated for {periods} closed period(s) since last result; {update=}")
+
+            if update == [[None, None]]:
+                result = self._query_item(**query_params)
+            else:
+                # mysql groups by local time of session, sqlite by utc
+                result = merge_serie(cached['result'], update, group, ts_serie_start, ts_from, local=self.db_driver.lower() == 'pymysql')
+
+        if result and result[0][0]:
+            self.serie_cache[key] = {'ts_current': ts_current, 'result': result}
+        else:
+            self.serie_cache.pop(key, None)
+
+        return result
+
+    def _query_consumption(self, item: Item, timeframe: str, start: int, end: int) -> tuple:
+        """
+        Get max and min value of period 'end' and the value of last entry before beginning of period 'start' with one query
+
+        :param item: item object for which the query should be done
+        :param timeframe: time increment für definition of start, end (day, week, month, year)
+        :param start: start of timeframe (oldest) given in x time increments, used for the previous entry
+        :param end: end of timeframe (newest) given in x time increments, used for max and min value
+
+        :return: tuple of (value_end, value_start, value_prev); None for errors or not available values; value_end 0 / value_prev 0, if no entry found
+        """
+
+        if self.prepare_debug:
+            self.logger.debug(f"_query_consumption called with item={item.path()}, {timeframe=}, {start=}, {end=}")
+
+        result = (None, None, None)
+
+        if timeframe not in ALLOWED_QUERY_TIMEFRAMES or not isinstance(start, int) or not isinstance(end, int) or start < end:
+            self.logger.warning(f"_query_consumption: Requested {timeframe=}, {start=}, {end=} for item={item.path()} not valid. Query cancelled.")
+            return result
+
+        # define item_id
+        item_id = self._get_itemid(item)
+        if not item_id:
+            self.logger.error(f"_query_consumption: ItemId for item={item.path()} not found. Query cancelled.")
+            return result
+
+        # define start and end of query as timestamp in microseconds
+        ts_start, ts_end = get_start_end_as_timestamp(timeframe, end, end, calendar=self._get_calendar())
+        ts_prev = get_start_end_as_timestamp(timeframe, start, end, calendar=self._get_calendar())[0]
+        oldest_log = int(self._get_oldest_log(item))
+
+        # check if values for end time and start time are in database
+        if ts_end < oldest_log:
+            self.logger.info(f"_query_consumption: Requested end time timestamp={ts_end} / {timestamp_to_timestring(ts_end)} of query for Item='{item.path()}' is prior to oldest entry with timestamp={oldest_log} / {timestamp_to_timestring(oldest_log)}. Query cancelled.")
+            return result
+
+        if ts_start < oldest_log and not self.use_oldest_entry:
+            self.logger.info(f"_query_consumption: Requested start time timestamp={ts_start} / {timestamp_to_timestring(ts_start)} of query for Item='{item.path()}' is prior to oldest entry with timestamp={oldest_log} / {timestamp_to_timestring(oldest_log)}. Query cancelled.")
+            return result
+
+        prev_available = True
+        if ts_prev < oldest_log:
+            if not self.use_oldest_entry:
+                prev_available = False
+            else:
+                ts_prev = oldest_log
+
+        # reference calculation: query min / max value of period and previous entry separately instead of using daily readings
+        if self._is_reference_calculation():
+            rows_min = self._query_log_timestamp('min', item_id, ts_start, ts_end)
+            rows_max = self._query_log_timestamp('max', item_id, ts_start, ts_end)
+            rows_prev = self._query_log_timestamp('next', item_id, ts_prev, ts_prev) if prev_available else []
+            if rows_min is None or rows_max is None or rows_prev is None:
+                self.logger.error(f"Error occurred during _query_consumption. Aborting...")
+                return result
+            value_start, value_end = first_value(rows_min), first_value(rows_max)
+            if value_end is None:
+                self.logger.info(f" No values for item in requested timeframe in database found.")
+                return result
+            value_prev = first_value(rows_prev) if prev_available else None
+            return value_end, value_start, 0 if prev_available and value_prev is None else value_prev
+
+        readings = self._get_counter_readings(item, ts_prev)
+        if readings is None:
+            self.logger.error(f"Error occurred during _query_consumption. Aborting...")
+            return result
+
+        value_start, value_end = readings_minmax(readings, ts_start, ts_end)
+        if value_end is None:
+            self.logger.info(f" No values for item in requested timeframe in database found.")
+            return result
+
+        value_prev = readings_previous(readings, ts_prev) if prev_available else None
+        if prev_available and value_prev is None:
+            value_prev = 0
+
+        if self.prepare_debug:
+            self.logger.debug(f"_query_consumption: values for item={item.path()} with {timeframe=}: {value_end=}, {value_start=}, {value_prev=}")
+
+        return value_end, value_start, value_prev
+
+    def _query_rolling_consumption(self, item: Item, db_addon_fct: str) -> Union[float, None]:
+        """
+        Get consumption of 'verbrauch_rolling' function like 'verbrauch_rolling_12m_woche_minus1' as difference of cumulative daily consumption
+
+        :param item: database item (counter)
+        :param db_addon_fct: 'verbrauch_rolling' function defining window and its end
+
+        :return: consumption within window; None for errors or not available values
+        """
+
+        window = get_rolling_window(db_addon_fct, today=self._get_calendar()['today'])
+        if window is None:
+            self.logger.info(f"_query_rolling_consumption: No adequate function for {db_addon_fct=} found.")
+            return
+        first_day, last_day = window
+
+        if self._is_reference_calculation():
+            return self._query_rolling_consumption_reference(item, first_day, last_day)
+
+        prefix = self._get_consumption_prefix(item, first_day - relativedelta(days=1))
+        if prefix is None:
+            self.logger.error(f"Error occurred during _query_rolling_consumption. Aborting...")
+            return
+
+        prefix_first_day = datetime.date.fromisoformat(prefix['first_date'])
+        if last_day < prefix_first_day or (last_day - prefix_first_day).days >= len(prefix['values']):
+            self.logger.info(f"_query_rolling_consumption: No values for item={item.path()} until {last_day} available. Query cancelled.")
+            return
+
+        value_end = prefix['values'][(last_day - prefix_first_day).days]
+        if first_day - relativedelta(days=1) >= prefix_first_day:
+            value_start = prefix['values'][(first_day - relativedelta(days=1) - prefix_first_day).days]
+        elif self.use_oldest_entry:
+            self.logger.info(f"_query_rolling_consumption: Requested start {first_day} for item={item.path()} is prior to oldest entry. Oldest available entry will be used.")
+            value_start = 0
+        else:
+            self.logger.info(f"_query_rolling_consumption: Requested start {first_day} for item={item.path()} is prior to oldest entry. Query cancelled.")
+            return
+
+        if self.prepare_debug:
+            self.logger.debug(f"_query_rolling_consumption: {db_addon_fct=} for item={item.path()} from {first_day} to {last_day}: {value_end=}, {value_start=}")
+
+        return round(value_end - value_start, 1)
+
+    def _query_rolling_consumption_reference(self, item: Item, first_day: datetime.date, last_day: datetime.date) -> Union[float, None]:
+        """
+        Get consumption within window of 'verbrauch_rolling' function as difference of last counter reading of window and
+        last counter reading prior to window (reference calculation of shadow mode without cumulative daily consumption)
+
+        :param item: database item (counter)
+        :param first_day: first day of window
+        :param last_day: last day of window
+
+        :return: consumption within window; None for errors or not available values
+        """
+
+        item_id = self._get_itemid(item)
+        if not item_id:
+            return
+
+        ts_first = datetime_to_timestamp(datetime.datetime.combine(first_day, datetime.time())) * 1000
+        ts_last = datetime_to_timestamp(datetime.datetime.combine(last_day + relativedelta(days=1), datetime.time())) * 1000
+        rows_end = self._query_log_timestamp('next', item_id, ts_last, ts_last)
+        rows_start = self._query_log_timestamp('next', item_id, ts_first, ts_first)
+        if rows_end is None or rows_start is None:
+            return
+
+        value_end, value_start = first_value(rows_end), first_value(rows_start)
+        if value_end is None:
+            self.logger.info(f"_query_rolling_consumption_reference: No values for item={item.path()} until {last_day} available. Query cancelled.")
+            return
+
+        if value_start is None:
+            if not self.use_oldest_entry:
+                self.logger.info(f"_query_rolling_consumption_reference: Requested start {first_day} for item={item.path()} is prior to oldest entry. Query cancelled.")
+                return
+            value_start = self._get_oldest_value(item)
+
+        return round(value_end - value_start, 1)
+
+    def _get_consumption_prefix(self, item: Item, first_day: datetime.date) -> Union[dict, None]:
+        """
+        Get cumulative daily consumption of counter from persistent data and extend it by days closed since last call.
+        Range covers the windows of all 'verbrauch_rolling' items of the database item; days not needed anymore will be dropped.
+
+        :param item: database item (counter)
+        :param first_day: first day, for which the cumulative consumption is needed at least
+
+        :return: dict like {'first_date': first day, 'until': first day not included, 'last': last counter reading, 'values': [cumulative consumption at end of day]}
+        """
+
+        today = self._get_calendar()['today']
+
+        # define first day needed by all items using the database item
+        for _item in self.get_item_list('database_item', item):
+            window = get_rolling_window(self.get_item_config(_item).get('db_addon_fct'), today=self._get_calendar()['today'])
+            if window:
+                first_day = min(first_day, window[0] - relativedelta(days=1))
+
+        oldest_log = self._get_oldest_log(item)
+        item_id = self._get_itemid(item)
+        if oldest_log is None or not item_id:
+            return
+        first_day = max(first_day, datetime.datetime.utcfromtimestamp(oldest_log / 1000).date())
+
+        prefixes = self.persistent_data.setdefault('consumption_prefix', {})
+        prefix = prefixes.get(str(item.path()))
+
+        if not prefix or datetime.date.fromisoformat(prefix['first_date']) > first_day or prefix['until'] > today.isoformat():
+            if self.prepare_debug:
+                self.logger.debug(f"_get_consumption_prefix: Cumulative consumption for item={item.path()} will be created from {first_day}.")
+            prefix = {'first_date': first_day.isoformat(), 'until': first_day.isoformat(), 'last': None, 'values': []}
+
+        # drop days not needed anymore
+        drop = (first_day - datetime.date.fromisoformat(prefix['first_date'])).days
+        if drop > 31:
+            prefix['values'] = prefix['values'][drop:]
+            prefix['first_date'] = first_day.isoformat()
+
+        # add days closed since last call
+        until = datetime.date.fromisoformat(prefix['until'])
+        if until < today:
+            ts_start = datetime_to_timestamp(datetime.datetime.combine(until, datetime.time())) * 1000
+            ts_end = datetime_to_timestamp(datetime.datetime.combine(today, datetime.time())) * 1000 - 1
+            rows = self._read_log_daily_minmax(item_id, ts_start, ts_end)
+            if rows is None:
+                return
+
+            days = {int(day): (value_min, value_max) for day, value_min, value_max in rows if day != -1 and value_max is not None}
+            last = prefix['last']
+            if last is None:
+                last = next((value_max for day, _, value_max in rows if day == -1), None)
+
+            total = prefix['values'][-1] if prefix['values'] else 0
+            for day in range((today - until).days):
+                if day in days:
+                    value_min, value_max = days[day]
+                    if last is None:
+                        last = value_min
+                    total += value_max - last if value_max >= last else value_max
+                    last = value_max
+                prefix['values'].append(round(total, 1))
+
+            prefix['last'] = last
+            prefix['until'] = today.isoformat()
+
+        prefixes[str(item.path())] = prefix
+        return prefix
+
+    def _query_counter_reading(self, item: Item, timeframe: str, start: int, end: int, ignore_value=None) -> Union[float, None]:
+        """
+        Get counter reading (max value) of item for period given by timeframe, start and end
+
+        :param item: item object for which the query should be done
+        :param timeframe: time increment für definition of start, end (day, week, month, year)
+        :param start: start of timeframe (oldest) given in x time increments
+        :param end: end of timeframe (newest) given in x time increments
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: counter reading; None for errors or if no value available
+        """
+
+        if timeframe not in ALLOWED_QUERY_TIMEFRAMES or not isinstance(start, int) or not isinstance(end, int) or start < end:
+            self.logger.warning(f"_query_counter_reading: Requested {timeframe=}, {start=}, {end=} for item={item.path()} not valid. Query cancelled.")
+            return
+
+        oldest_log = self._get_oldest_log(item)
+        if oldest_log is None:
+            self.logger.error(f"_query_counter_reading: Oldest log for item={item.path()} not found. Query cancelled.")
+            return
+
+        ts_start, ts_end = get_start_end_as_timestamp(timeframe, start, end, calendar=self._get_calendar())
+        if ts_end < oldest_log:
+            self.logger.info(f"_query_counter_reading: Requested end time timestamp={ts_end} / {timestamp_to_timestring(ts_end)} of query for Item='{item.path()}' is prior to oldest entry with timestamp={oldest_log} / {timestamp_to_timestring(oldest_log)}. Query cancelled.")
+            return
+
+        if ts_start < oldest_log and not self.use_oldest_entry:
+            self.logger.info(f"_query_counter_reading: Requested start time timestamp={ts_start} / {timestamp_to_timestring(ts_start)} of query for Item='{item.path()}' is prior to oldest entry with timestamp={oldest_log} / {timestamp_to_timestring(oldest_log)}. Query cancelled.")
+            return
+
+        # reference calculation: query max value of period instead of using daily readings
+        if self._is_reference_calculation():
+            item_id = self._get_itemid(item)
+            rows = self._query_log_timestamp('max', item_id, ts_start, ts_end, ignore_value=ignore_value) if item_id else None
+            return first_value(rows)
+
+        readings = self._get_counter_readings(item, ts_start, ignore_value)
+        if readings is None:
+            self.logger.error(f"Error occurred during _query_counter_reading. Aborting...")
+            return
+
+        return readings_minmax(readings, ts_start, ts_end)[1]
+
+    def _get_counter_readings(self, item: Item, ts_start: int, ignore_value=None) -> Union[dict, None]:
+        """
+        Get daily min / max values of counter from cache dict or get them from db with one grouped query and put it to cache dict.
+        The query covers the range of all 'verbrauch' and 'zaehlerstand' items of the database item, so that it is done once a day.
+
+        :param item: database item
+        :param ts_start: timestamp in microseconds, from which readings are needed at least
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: dict like {'date': date of query, 'ts_start': start timestamp, 'days': {day index: (min, max)}, 'prev': value prior to start}
+        """
+
+        today = self._get_calendar()['today']
+        readings = self.counter_readings.get((item, ignore_value))
+        if readings and readings['date'] == today and readings['ts_start'] <= ts_start:
+            return readings
+
+        # define start of query covering all items using the database item
+        for _item in self.get_item_list('database_item', item):
+            _range = get_counter_reading_range(self.get_item_config(_item).get('db_addon_fct'), today=self._get_calendar()['today'])
+            if _range:
+                timeframe, start, end = _range
+                ts_start = min(ts_start, get_start_end_as_timestamp(timeframe, start, end, calendar=self._get_calendar())[0])
+        ts_end = get_start_end_as_timestamp('day', 0, 0, calendar=self._get_calendar())[1]
+
+        item_id = self._get_itemid(item)
+        if not item_id:
+            return
+
+        rows = self._read_log_daily_minmax(item_id, ts_start, ts_end, ignore_value)
+        if rows is None:
+            return
+
+        readings = {'date': today, 'ts_start': ts_start, 'days': {}, 'prev': None}
+        for day, value_min, value_max in rows:
+            if day == -1:
+                readings['prev'] = None if value_max is None else round(value_max, 1)
+            elif value_max is not None:
+                readings['days'][int(day)] = (round(value_min, 1), round(value_max, 1))
+
+        if self.prepare_debug:
+            self.logger.debug(f"_get_counter_readings: {len(readings['days'])} daily readings for item={item.path()} from {timestamp_to_timestring(ts_start)} fetched.")
+
+        self.counter_readings[(item, ignore_value)] = readings
+        return readings
+
+    def _handle_query_result(self, query_result) -> list:
+        """
+        Handle query result containing list
+
+        :param query_result: list of tuples like (timestamp, value) as returned by database query
+        :return: list of value pairs [[None, None]] for errors, [[0,0]] for no values found
+        """
+
+        # if query delivers None, abort
+        if query_result is None:
+            self.logger.error(f"Error occurred during _query_item. Aborting...")
+            _result = [[None, None]]
+        elif len(query_result) == 0:
+            _result = [[0, 0]]
+            self.logger.info(f" No values for item in requested timeframe in database found.")
+        else:
+            _result = []
+            for element in query_result:
+                timestamp = element[0]
+                value = element[1]
+                if timestamp and value is not None:
+                    _result.append([timestamp, round(value, 1)])
+            if not _result:
+                _result = [[None, None]]
+
+        return _result
+
+    def _query_items(self, func: str, items: list, timeframe: str, start: int = None, end: int = 0, group: str = None, ignore_value=None) -> dict:
+        """
+        Do diverse checks of input, and prepare one query of log for several items by getting item_ids, start / end in timestamp etc.
+
+        :param func: function to be used at query (avg, min, max, sum, on, integrate, raw)
+        :param items: list of item objects for which the query should be done
+        :param timeframe: time increment für definition of start, end (day, week, month, year)
+        :param start: start of timeframe (oldest) for query given in x time increments (default = None, meaning complete database)
+        :param end: end of timeframe (newest) for query given in x time increments (default = 0, meaning end of today, end of last week, end of last month, end of last year)
+        :param group: grouping parameter (default = None, possible values: day, week, month, year)
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: dict with item as key and query response / list for value pairs as value
+        """
+
+        if self.prepare_debug:
+            self.logger.debug(f"_query_items called with {func=}, items={[item.path() for item in items]}, {timeframe=}, {start=}, {end=}, {group=}, {ignore_value=}")
+
+        # set default result
+        result = {item: [[None, None]] for item in items}
+
+        # check correctness of func
+        if func not in ALLOWED_MULTI_ITEM_FUNCS:
+            self.logger.error(f"_query_items: Requested {func=} not possible for several items; Need to be one of {ALLOWED_MULTI_ITEM_FUNCS}. Query cancelled.")
+            return result
+
+        # check correctness of timeframe
+        if timeframe not in ALLOWED_QUERY_TIMEFRAMES:
+            self.logger.error(f"_query_items: Requested {timeframe=} not defined; Need to be 'year' or 'month' or 'week' or 'day' or 'hour''. Query cancelled.")
+            return result
+
+        # check start / end for being int
+        if isinstance(start, str) and start.isdigit():
+            start = int(start)
+        if isinstance(end, str) and end.isdigit():
+            end = int(end)
+        if not isinstance(end, int) or (start is not None and not isinstance(start, int)):
+            return result
+
+        # check correctness of start / end
+        if start is not None and start < end:
+            self.logger.warning(f"_query_items: Requested {start=} is not valid since {start=} < {end=}. Query cancelled.")
+            return result
+
+        # define start and end of query as timestamp in microseconds
+        ts_start, ts_end = get_start_end_as_timestamp(timeframe, start, end, calendar=self._get_calendar())
+
+        # define item_ids and check if values for end time and start time are in database
+        item_ids = self._get_itemids(items)
+        oldest_logs = self._get_oldest_logs(items)
+        query_items = {}
+        for item in items:
+            item_id = item_ids.get(item)
+            if not item_id:
+                self.logger.error(f"_query_items: ItemId for item={item.path()} not found. Item skipped.")
+                continue
+
+            oldest_log = oldest_logs.get(item)
+            if oldest_log is None:
+                continue
+
+            if ts_end < oldest_log:
+                self.logger.info(f"_query_items: Requested end time timestamp={ts_end} / {timestamp_to_timestring(ts_end)} of query for Item='{item.path()}' is prior to oldest entry with timestamp={oldest_log} / {timestamp_to_timestring(oldest_log)}. Item skipped.")
+                continue
+
+            if start is not None and ts_start < oldest_log and not self.use_oldest_entry:
+                self.logger.info(f"_query_items: Requested start time timestamp={ts_start} / {timestamp_to_timestring(ts_start)} of query for Item='{item.path()}' is prior to oldest entry with timestamp={oldest_log} / {timestamp_to_timestring(oldest_log)}. Item skipped.")
+                continue
+
+            query_items[item_id] = item
+
+        if not query_items:
+            return result
+
+        # without start, the complete database will be queried; since there are no entries before the oldest entry, using the oldest one of all items is equivalent
+        if start is None:
+            ts_start = min(int(oldest_logs[item]) for item in query_items.values())
+
+        query_params = {'func': func, 'item_id': list(query_items), 'ts_start': ts_start, 'ts_end': ts_end, 'group': group, 'ignore_value': ignore_value}
+        query_result = self._query_log_timestamp(**query_params)
+
+        if query_result is None:
+            self.logger.error(f"Error occurred during _query_items. Aborting...")
+            return result
+
+        # split query result per item_id
+        item_rows = {}
+        for row in query_result:
+            item_rows.setdefault(row[0], []).append(row[1:])
+
+        for item_id, item in query_items.items():
+            result[item] = self._handle_query_result(item_rows.get(item_id, []))
+
+        if self.prepare_debug:
+            self.logger.debug(f"_query_items: values for items with {timeframe=}, {func=}: {result}")
+
+        return result
+
     def _init_cache_dicts(self) -> None:
         """
         init all cache dicts
@@ -2088,6 +3649,12 @@ class DatabaseAddOn(SmartPlugin):
 
         self.item_cache = {}
 
+        self.onchange_item_states = {}
+
+        self.counter_readings = {}
+
+        self.serie_cache = {}
+
         self.current_values = {
             DAY: {},
             WEEK: {},
@@ -2109,6 +3676,8 @@ class DatabaseAddOn(SmartPlugin):
 
         self.logger.info(f"Working queue will be cleared. Calculation run will end.")
         self.item_queue.queue.clear()
+        if self.log_index_creation.get('state') == 'queued':
+            self.log_index_creation = {}
 
     def _work_item_queue_thread_startup(self):
         """
@@ -2142,20 +3711,46 @@ class DatabaseAddOn(SmartPlugin):
     #   Database Query Preparation
     ##############################
 
-    def _query_log_timestamp(self, func: str, item_id: int, ts_start: int, ts_end: int, group: str = None, group2: str = None, ignore_value=None) -> Union[list, None]:
+    def _query_log_timestamp(self, func: str, item_id: int, ts_start: int, ts_end: int, group: str = None, group2: str = None, ignore_value=None, row_handler=None) -> Union[list, int, None]:
         """
         Assemble a mysql query str and param dict based on given parameters, get query response and return it
 
         :param func: function to be used at query
-        :param item_id: database item_id for which the query should be done
+        :param item_id: database item_id for which the query should be done; list of item_ids to query several items at once
         :param ts_start: start for query given in timestamp in microseconds
         :param ts_end: end for query given in timestamp in microseconds
         :param group: first grouping parameter (default = None, possible values: day, week, month, year)
         :param group2: second grouping parameter (default = None, possible values: day, week, month, year)
         :param ignore_value: value of val_num, which will be ignored during query
+        :param row_handler: function called with each row of query response; if given, rows are streamed to it
+
+        :return: query response; number of streamed rows if row_handler is given
+
+        """
+
+        prepared = self._prepare_log_timestamp_query(func, item_id, ts_start, ts_end, group, group2, ignore_value)
+        if prepared is None:
+            return
+        query, params = prepared
 
-        :return: query response
+        # request database and return result
+        if row_handler is not None:
+            return self._fetchstream(query, params, row_handler, db=self._get_read_db())
+        return self._fetchall(query, params, db=self._get_read_db())
 
+    def _prepare_log_timestamp_query(self, func: str, item_id: int, ts_start: int, ts_end: int, group: str = None, group2: str = None, ignore_value=None) -> Union[tuple, None]:
+        """
+        Assemble a query str and param dict for log table based on given parameters
+
+        :param func: function to be used at query
+        :param item_id: database item_id for which the query should be done; list of item_ids to query several items at once
+        :param ts_start: start for query given in timestamp in microseconds
+        :param ts_end: end for query given in timestamp in microseconds
+        :param group: first grouping parameter (default = None, possible values: day, week, month, year)
+        :param group2: second grouping parameter (default = None, possible values: day, week, month, year)
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: tuple of query and params; None, if query could not be assembled
         """
 
         # do debug log
@@ -2255,24 +3850,56 @@ class DatabaseAddOn(SmartPlugin):
             params.update({'ts_end': ts_end})
 
         # assemble query
-        query = f"SELECT {_select[func]}FROM {_db_table}WHERE {_where}{_group_by[group]}ORDER BY {_order}{_table_alias[func]}{_group_by[group2]}".strip()
+        if isinstance(item_id, list):
+            # handle query for several items at once; just possible for functions without subquery
+            if func not in ALLOWED_MULTI_ITEM_FUNCS or group2:
+                self.logger.error(f"_query_log_timestamp: Requested {func=} with {group2=} not possible for several items. Query cancelled.")
+                return
+            _where = _where.replace("item_id = :item_id", f"item_id IN ({', '.join(str(int(_id)) for _id in item_id)})")
+            if group:
+                _group_by_items = _group_by[group].replace('GROUP BY ', 'GROUP BY item_id, ', 1)
+            else:
+                _group_by_items = '' if func == 'raw' else 'GROUP BY item_id '
+            params.pop('item_id')
+            query = f"SELECT item_id, {_select[func]}FROM {_db_table}WHERE {_where}{_group_by_items}ORDER BY item_id ASC, {_order}".strip()
+        else:
+            query = f"SELECT {_select[func]}FROM {_db_table}WHERE {_where}{_group_by[group]}ORDER BY {_order}{_table_alias[func]}{_group_by[group2]}".strip()
 
         if self.db_driver.lower() == 'sqlite3':
             query = query.replace('IF', 'IIF')
 
-        # do debug log
-        if self.prepare_debug:
-            self.logger.debug(f"_query_log_timestamp: {query=}, {params=}")
+        # do debug log
+        if self.prepare_debug:
+            self.logger.debug(f"_query_log_timestamp: {query=}, {params=}")
+
+        return query, params
+
+    def _read_log_daily_minmax(self, item_id: int, ts_start: int, ts_end: int, ignore_value=None) -> Union[list, None]:
+        """
+        Read min and max value per day within given time range and value of last record before ts_start with one query
+
+        :param item_id: Database ID of item to read the record for
+        :param ts_start: start of time range given in timestamp in microseconds (beginning of day)
+        :param ts_end: end of time range given in timestamp in microseconds
+        :param ignore_value: value of val_num, which will be ignored during query
+
+        :return: list of tuples like (day index, min value, max value); day index -1 with value of last record before ts_start as max value
+        """
 
-        # request database and return result
-        return self._fetchall(query, params)
+        _day = "(time - :ts_start) DIV 86400000" if self.db_driver.lower() == 'pymysql' else "(time - :ts_start) / 86400000"
+        _ignore = f"AND val_num != {ignore_value} " if ignore_value else ''
+        params = {'item_id': item_id, 'ts_start': ts_start, 'ts_end': ts_end}
+        query = (f"SELECT {_day} AS day, MIN(val_num), MAX(val_num) FROM log WHERE item_id = :item_id AND time BETWEEN :ts_start AND :ts_end AND val_bool = 1 {_ignore}GROUP BY day "
+                 "UNION ALL SELECT -1, NULL, (SELECT val_num FROM log WHERE item_id = :item_id AND time < :ts_start ORDER BY time DESC LIMIT 1)")
+        return self._fetchall(query, params, db=self._get_read_db())
 
-    def _read_log_all(self, item_id: int):
+    def _read_log_all(self, item_id: int, row_handler=None):
         """
         Read the oldest log record for given item
 
         :param item_id: item_id to read the record for
-        :return: Log record for item_id
+        :param row_handler: function called with each log record; if given, records are streamed to it instead of being returned
+        :return: Log record for item_id; number of streamed records if row_handler is given
         """
 
         if self.prepare_debug:
@@ -2280,7 +3907,9 @@ class DatabaseAddOn(SmartPlugin):
 
         query = "SELECT * FROM log WHERE (item_id = :item_id) AND (time = None OR 1 = 1)"
         params = {'item_id': item_id}
-        result = self._fetchall(query, params)
+        if row_handler is not None:
+            return self._fetchstream(query, params, row_handler, db=self._get_read_db())
+        result = self._fetchall(query, params, db=self._get_read_db())
         return result
 
     def _read_log_oldest(self, item_id: int, cur=None) -> int:
@@ -2298,6 +3927,47 @@ class DatabaseAddOn(SmartPlugin):
         query = "SELECT min(time) FROM log WHERE item_id = :item_id;"
         return self._fetchall(query, params, cur=cur)[0][0]
 
+    def _read_log_oldest_items(self, item_ids: list, cur=None) -> Union[list, None]:
+        """
+        Read the timestamp of the oldest log record for several database IDs with one query
+
+        :param item_ids: list of database IDs of items to read the record for
+        :param cur: A database cursor object if available (optional)
+
+        :return: list of tuples like (item_id, timestamp of oldest log)
+        """
+
+        query = f"SELECT item_id, min(time) FROM log WHERE item_id IN ({', '.join(str(int(_id)) for _id in item_ids)}) GROUP BY item_id;"
+        return self._fetchall(query, cur=cur)
+
+    def _read_log_timestamp_items(self, timestamps: dict, cur=None) -> Union[list, None]:
+        """
+        Read database log records of several database IDs at given timestamps with one query
+
+        :param timestamps: dict with database ID as key and timestamp as value
+        :param cur: A database cursor object if available (optional)
+
+        :return: list of tuples like (item_id, time, val_num)
+        """
+
+        _where = " OR ".join(f"(item_id = {int(item_id)} AND time = {int(ts)})" for item_id, ts in timestamps.items())
+        query = f"SELECT item_id, time, val_num FROM log WHERE {_where};"
+        return self._fetchall(query, cur=cur)
+
+    def _read_log_count_newest_items(self, timestamps: dict, cur=None) -> Union[list, None]:
+        """
+        Read count and timestamp of newest log record of several database IDs, which are newer than given timestamps, with one query
+
+        :param timestamps: dict with database ID as key and timestamp as value
+        :param cur: A database cursor object if available (optional)
+
+        :return: list of tuples like (item_id, count, timestamp of newest log)
+        """
+
+        _where = " OR ".join(f"(item_id = {int(item_id)} AND time > {int(ts)})" for item_id, ts in timestamps.items())
+        query = f"SELECT item_id, count(*), max(time) FROM log WHERE {_where} GROUP BY item_id;"
+        return self._fetchall(query, cur=cur)
+
     def _read_log_timestamp(self, item_id: int, timestamp: int, cur=None) -> Union[list, None]:
         """
         Read database log record for given database ID
@@ -2339,6 +4009,23 @@ class DatabaseAddOn(SmartPlugin):
 
         return self._fetchone(query)
 
+    def _read_item_table_ids(self, item_paths: list) -> Union[list, None]:
+        """
+        Read id and name of several items from item table with one query
+
+        :param item_paths: list of item_paths for Items within the database
+
+        :return: list of tuples like (id, name)
+        """
+
+        if not item_paths:
+            return []
+
+        names = ", ".join("'{}'".format(item_path.replace("'", "''")) for item_path in item_paths)
+        query = f"SELECT id, name FROM item WHERE name IN ({names})"
+
+        return self._fetchall(query)
+
     def _get_db_version(self) -> str:
         """
         Query the database version and provide result
@@ -2355,6 +4042,67 @@ class DatabaseAddOn(SmartPlugin):
         query = "SHOW GLOBAL VARIABLES LIKE 'connect_timeout'"
         return self._fetchone(query)
 
+    def _get_db_log_indexes(self) -> dict:
+        """
+        Query indexes of log table
+
+        :return: dict with index name as key and list of index columns as value
+        """
+
+        indexes = {}
+        if self.db_driver.lower() == 'sqlite3':
+            for index in self._fetchall("PRAGMA index_list(log)") or []:
+                indexes[index[1]] = [column[2] for column in sorted(self._fetchall(f"PRAGMA index_info({index[1]})") or [])]
+        else:
+            # columns of result: Table, Non_unique, Key_name, Seq_in_index, Column_name, ...
+            for index in sorted(self._fetchall("SHOW INDEX FROM log") or [], key=lambda x: (x[2], x[3])):
+                indexes.setdefault(index[2], []).append(index[4])
+        return indexes
+
+    def _explain_log_query(self) -> str:
+        """
+        Explain query plan of representative queries of plugin as generated by _query_log_timestamp (raw values for series
+        and mean of hourly averages per day for avg1 functions)
+
+        :return: query plan as str
+        """
+
+        def _explain(_query, _params, cur=None):
+            cur = self._db.cursor()
+            try:
+                self._db.execute(_query, _params, cur=cur)
+                rows = cur.fetchall()
+                columns = [column[0] for column in cur.description] if cur.description else []
+            finally:
+                cur.close()
+            return [dict(zip(columns, row)) for row in rows or []]
+
+        ts_end = int(time.time() * 1000)
+        ts_start = ts_end - 86400000
+        plans = []
+        for func, group, group2 in (('raw', None, None), ('avg1', 'hour', 'day')):
+            prepared = self._prepare_log_timestamp_query(func, 1, ts_start, ts_end, group, group2)
+            if prepared is None:
+                continue
+            query, params = prepared
+            if self.db_driver.lower() == 'sqlite3':
+                result = self._query(_explain, f"EXPLAIN QUERY PLAN {query}", params)
+                plan = ', '.join(str(row.get('detail')) for row in result or [])
+            else:
+                # column names of EXPLAIN differ between MySQL and MariaDB versions; missing columns are reported as None
+                result = self._query(_explain, f"EXPLAIN {query}", params)
+                plan = ', '.join(f"table={row.get('table')}, type={row.get('type')}, key={row.get('key')}, rows={row.get('rows')}" for row in result or [])
+            plans.append(f"{func}: {plan if plan else 'not available'}")
+        return '; '.join(plans)
+
+    def _get_db_threads_running(self) -> list:
+        """
+        Query number of running threads of database
+        """
+
+        query = "SHOW GLOBAL STATUS LIKE 'Threads_running'"
+        return self._fetchone(query)
+
     def _get_db_net_read_timeout(self) -> list:
         """
         Query database timeout net_read_timeout
@@ -2367,36 +4115,193 @@ class DatabaseAddOn(SmartPlugin):
     #   Database Queries
     ##############################
 
-    def _execute(self, query: str, params: dict = None, cur=None) -> list:
+    def _update_query_latency(self, key: str, duration: float) -> None:
+        """
+        Update short and long term average of query duration relative to median of last durations of same db_addon_fct or
+        query category, so that heavy functions (like serie at midnight) do not look like contention of the database
+
+        :param key: db_addon_fct of item the query is done for, otherwise query category
+        :param duration: duration of query in seconds
+        """
+
+        durations = self.query_durations.get(key)
+        if not durations or len(durations) < THROTTLE_MIN_SAMPLES:
+            return
+        baseline = percentile(sorted(durations), 0.5)
+        if not baseline:
+            return
+        duration = duration / baseline
+
+        if self.query_latency['slow'] is None:
+            self.query_latency = {'fast': duration, 'slow': duration}
+        else:
+            self.query_latency['fast'] = round(0.3 * duration + 0.7 * self.query_latency['fast'], 4)
+            self.query_latency['slow'] = round(0.02 * duration + 0.98 * self.query_latency['slow'], 4)
+
+    def _record_query_duration(self, key: str, duration: float) -> None:
+        """
+        Record duration of query for metrics
+
+        :param key: db_addon_fct of item the query is done for, otherwise query category
+        :param duration: duration of query in seconds
+        """
+
+        durations = self.query_durations.get(key)
+        if durations is None:
+            durations = self.query_durations[key] = collections.deque(maxlen=METRICS_LATENCY_SAMPLES)
+            self.query_duration_totals[key] = [0, 0]
+        durations.append(duration)
+        totals = self.query_duration_totals[key]
+        totals[0] += 1
+        totals[1] += duration
+
+    def get_metrics(self) -> str:
+        """
+        Provide performance metrics in Prometheus / OpenMetrics text format
+
+        :return: metrics as text
+        """
+
+        lines = []
+
+        def _metric(name: str, metric_type: str, description: str, samples: list):
+            lines.append(f"# HELP db_addon_{name} {description}")
+            lines.append(f"# TYPE db_addon_{name} {metric_type}")
+            for labels, value in samples:
+                _labels = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"db_addon_{name}{{{_labels}}} {value}" if _labels else f"db_addon_{name} {value}")
+
+        queue_depth = collections.Counter()
+        for entry in list(self.item_queue.queue):
+            queue_depth['onchange' if isinstance(entry, tuple) else get_query_category(self.get_item_config(entry).get('db_addon_fct'))] += 1
+        queue_depth['deferred'] = len(self.deferred_items)
+        _metric('queue_depth', 'gauge', 'Number of items in working queue per class', [({'class': key}, value) for key, value in sorted(queue_depth.items())])
+
+        _metric('items_processed_total', 'counter', 'Number of processed items per kind', [({'kind': key}, value) for key, value in self.processed_items.items()])
+
+        samples = []
+        for key in sorted(self.query_durations):
+            durations = sorted(self.query_durations[key])
+            samples.extend(({'function': key, 'quantile': str(q)}, round(percentile(durations, q), 4)) for q in METRICS_QUANTILES)
+        _metric('query_duration_seconds', 'summary', 'Duration of database queries per function', samples)
+        for key in sorted(self.query_duration_totals):
+            count, total = self.query_duration_totals[key]
+            lines.append(f'db_addon_query_duration_seconds_count{{function="{key}"}} {count}')
+            lines.append(f'db_addon_query_duration_seconds_sum{{function="{key}"}} {round(total, 4)}')
+
+        _metric('db_connects_total', 'counter', 'Number of (re)connects to database', [({}, self.db_connect_count)])
+        _metric('overdue_queries_total', 'counter', 'Number of queries cancelled due to timeout', [({}, self.overdue_query_count)])
+
+        cache_sizes = {'item_cache': len(self.item_cache),
+                       'current_values': sum(len(values) for values in self.current_values.values()),
+                       'previous_values': sum(len(values) for values in self.previous_values.values()),
+                       'run_cache': len(self.run_cache),
+                       'serie_cache': len(self.serie_cache),
+                       'raw_query_cache': len(self.raw_query_cache)}
+        _metric('cache_size', 'gauge', 'Number of entries per cache', [({'cache': key}, value) for key, value in cache_sizes.items()])
+
+        cache_stats = {**self.cache_stats, 'run_cache': self.run_cache_stats, 'raw_query_cache': self.raw_query_stats}
+        _metric('cache_hits_total', 'counter', 'Number of cache hits per cache', [({'cache': key}, stats['hits']) for key, stats in cache_stats.items()])
+        _metric('cache_misses_total', 'counter', 'Number of cache misses per cache', [({'cache': key}, stats['misses']) for key, stats in cache_stats.items()])
+        _metric('cache_hit_ratio', 'gauge', 'Ratio of cache hits per cache', [({'cache': key}, round(stats['hits'] / (stats['hits'] + stats['misses']), 4)) for key, stats in cache_stats.items() if stats['hits'] + stats['misses']])
+
+        if self.last_due_run_duration is not None:
+            _metric('due_run_duration_seconds', 'gauge', 'Duration of last run of due items', [({}, self.last_due_run_duration)])
+        _metric('throttle_level', 'gauge', 'Current throttle level', [({}, self.throttle_level)])
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _execute(self, query: str, params: dict = None, cur=None, db=None) -> list:
+        if params is None:
+            params = {}
+        if db is None:
+            db = self._db
+
+        return self._query(db.execute, query, params, cur, db)
+
+    def _fetchone(self, query: str, params: dict = None, cur=None, db=None) -> list:
         if params is None:
             params = {}
+        if db is None:
+            db = self._db
 
-        return self._query(self._db.execute, query, params, cur)
+        return self._query(db.fetchone, query, params, cur, db)
 
-    def _fetchone(self, query: str, params: dict = None, cur=None) -> list:
+    def _fetchall(self, query: str, params: dict = None, cur=None, db=None) -> list:
         if params is None:
             params = {}
+        if db is None:
+            db = self._db
+
+        return self._query(db.fetchall, query, params, cur, db)
 
-        return self._query(self._db.fetchone, query, params, cur)
+    def _fetchstream(self, query: str, params: dict = None, row_handler=None, db=None) -> Union[int, None]:
+        """
+        Execute query and pass rows of response in batches to row_handler without loading complete response into memory.
+        For mysql an unbuffered server side cursor is used; the connection is locked for other threads until the stream is
+        finished and must not be used for other queries within row_handler.
+        Query errors (like timeout) may occur after part of the rows has been passed, so row_handler must fill a local
+        structure, which is used just if the query succeeded. Exceptions of row_handler are raised, not handled as query errors.
+
+        :param query: query to be executed
+        :param params: dict of query parameters
+        :param row_handler: function called with each row of query response
+        :param db: database object to be used (default = None, meaning database object of main connection)
+        :return: number of rows passed to row_handler; None for query errors
+        """
 
-    def _fetchall(self, query: str, params: dict = None, cur=None) -> list:
         if params is None:
             params = {}
+        if db is None:
+            db = self._db
 
-        return self._query(self._db.fetchall, query, params, cur)
+        handler_errors = []
 
-    def _query(self, fetch, query: str, params: dict = None, cur=None) -> Union[None, list]:
+        def _stream(_query, _params, cur=None):
+            if self.db_driver.lower() == 'pymysql':
+                import pymysql.cursors
+                cur = db._conn.cursor(pymysql.cursors.SSCursor)
+            else:
+                cur = db.cursor()
+            count = 0
+            try:
+                db.execute(_query, _params, cur=cur)
+                while True:
+                    rows = cur.fetchmany(STREAM_BATCH_SIZE)
+                    if not rows:
+                        break
+                    try:
+                        for row in rows:
+                            row_handler(row)
+                    except Exception as e:
+                        # keep exception of row_handler apart from query errors handled by _query
+                        handler_errors.append(e)
+                        break
+                    count += len(rows)
+            finally:
+                cur.close()
+            return count
+
+        count = self._query(_stream, query, params, db=db)
+        if handler_errors:
+            raise handler_errors[0]
+        return count
+
+    def _query(self, fetch, query: str, params: dict = None, cur=None, db=None) -> Union[None, list]:
         if params is None:
             params = {}
+        if db is None:
+            db = self._db
 
         if self.sql_debug:
             self.logger.debug(f"_query: Called with {query=}, {params=}, {cur=}")
 
-        if not self._initialize_db():
+        if not self._initialize_db(db):
             return None
 
         if cur is None:
-            if self._db.verify(5) == 0:
+            if db.verify(5) == 0:
                 self.logger.error("_query: Connection to database not recovered.")
                 return None
             # if not self._db.lock(300):
@@ -2405,19 +4310,97 @@ class DatabaseAddOn(SmartPlugin):
 
         query_readable = re.sub(r':([a-z_]+)', r'{\1}', query).format(**params)
 
+        category = getattr(self._query_context, 'category', None) or 'default'
+        timeout = self.query_timeout.get(category, self.query_timeout.get('default'))
+        sqlite = self.db_driver.lower() == 'sqlite3'
+        timed = bool(timeout) and query.lstrip().upper().startswith('SELECT')
+
+        # queries of a connection are serialized, since sqlite progress handler and unbuffered mysql result (stream) are bound to connection
+        lock = self._db_locks.setdefault(id(db), threading.RLock())
+        lock.acquire()
+
+        # set time limit for query
+        if timed:
+            if sqlite:
+                deadline = time.time() + timeout
+                db._conn.set_progress_handler(lambda: time.time() > deadline, SQLITE_PROGRESS_STEPS)
+            elif self.db_is_mariadb:
+                query = f"SET STATEMENT max_statement_time={timeout} FOR {query}"
+            elif self.db_is_mariadb is False:
+                query = re.sub(r'^\s*select', f'SELECT /*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */', query, count=1, flags=re.I)
+
+        _start = time.time()
         try:
             tuples = fetch(query, params, cur=cur)
         except Exception as e:
-            self.logger.error(f"_query: Error for query '{query_readable}': {e}")
+            if is_query_timeout_error(e):
+                self.overdue_query_count += 1
+                self.overdue_queries.append({'time': self.shtime.now().strftime('%d.%m.%Y %H:%M:%S'), 'item': self.active_queue_item, 'category': category, 'timeout': timeout, 'query': query_readable})
+                self.logger.error(f"_query: Query for item '{self.active_queue_item}' with {category=} cancelled, since it exceeded time limit of {timeout}s. Query was '{query_readable}'")
+            else:
+                self.logger.error(f"_query: Error for query '{query_readable}': {e}")
         else:
             if self.sql_debug:
                 self.logger.debug(f"_query: Result of '{query_readable}': {tuples}")
+            if query_readable.lstrip().upper().startswith('SELECT'):
+                _key, _duration = getattr(self._query_context, 'fct', None) or category, time.time() - _start
+                self._update_query_latency(_key, _duration)
+                self._record_query_duration(_key, _duration)
             return tuples
+        finally:
+            if sqlite and timed:
+                db._conn.set_progress_handler(None, 0)
+            lock.release()
         # finally:
         #    if cur is None:
         #         self._db.release()
 
 
+##############################
+#   State records
+##############################
+
+
+class DatabaseItemState:
+    """
+    State of database item: id within database, timestamp and value of oldest log
+    """
+
+    __slots__ = ('id', 'oldest_log', 'oldest_value', 'oldest_entry')
+
+    def __init__(self, item_id: int = None, oldest_log: int = None, oldest_value=None):
+        self.id = item_id
+        self.oldest_log = oldest_log
+        self.oldest_value = oldest_value
+        self.oldest_entry = None
+
+    def __repr__(self):
+        return f"{{'id': {self.id}, 'oldest_log': {self.oldest_log}, 'oldest_value': {self.oldest_value}}}"
+
+
+class OnchangeItemState:
+    """
+    Parsed config of on-change item: database item, function split into kind ('minmax' / 'verbrauch'), timeframe and func
+    """
+
+    __slots__ = ('database_item', 'db_addon_fct', 'ignore_value', 'kind', 'timeframe', 'func')
+
+    def __init__(self, database_item, db_addon_fct: str, ignore_value=None):
+        self.database_item = database_item
+        self.db_addon_fct = db_addon_fct
+        self.ignore_value = ignore_value
+        self.kind = self.timeframe = self.func = None
+
+        _var = db_addon_fct.split('_')
+        if db_addon_fct.startswith('minmax') and len(_var) == 3 and _var[2] in ['min', 'max']:
+            self.kind, self.timeframe, self.func = 'minmax', convert_timeframe(_var[1]), _var[2]
+        elif db_addon_fct.startswith('verbrauch') and len(_var) == 2 and _var[1] in ['heute', 'woche', 'monat', 'jahr']:
+            self.kind, self.timeframe = 'verbrauch', convert_timeframe(_var[1])
+
+    def __repr__(self):
+        return f"{{'db_addon_fct': {self.db_addon_fct!r}, 'kind': {self.kind!r}, 'timeframe': {self.timeframe!r}, 'func': {self.func!r}}}"
+
+
 ##############################
 #   Helper functions
 ##############################
@@ -2558,27 +4541,59 @@ def count_to_start(count: int = 0, end: int = 0):
     return end + count, end
 
 
-def get_start_end_as_timestamp(timeframe: str, start: int, end: int) -> tuple:
+def get_start_end_as_timestamp(timeframe: str, start: int, end: int, calendar: types.MappingProxyType = None) -> tuple:
     """
     Provides start and end as timestamp in microseconds from timeframe with start and end
 
     :param timeframe: timeframe as week, month, year
     :param start: beginning timeframe in x timeframes from now
     :param end: end of timeframe in x timeframes from now
+    :param calendar: calendar snapshot as created by create_calendar; boundaries will be looked up there, "now" is taken from snapshot
 
     :return: start time in timestamp in microseconds, end time in timestamp in microseconds
 
     """
 
-    return datetime_to_timestamp(get_start(timeframe, start)) * 1000, datetime_to_timestamp(get_end(timeframe, end)) * 1000
+    today = None
+    if calendar is not None:
+        _timeframe = timeframe if timeframe in calendar['start'] else 'day'
+        _start = 0 if start is None else start
+        _starts, _ends = calendar['start'][_timeframe], calendar['end'][_timeframe]
+        if isinstance(_start, int) and isinstance(end, int) and 0 <= _start < len(_starts) and 0 <= end < len(_ends):
+            return _starts[_start], _ends[end]
+        today = calendar['today']
+
+    return datetime_to_timestamp(get_start(timeframe, start, today)) * 1000, datetime_to_timestamp(get_end(timeframe, end, today)) * 1000
+
+
+def create_calendar(today: datetime.date = None) -> types.MappingProxyType:
+    """
+    Create calendar snapshot: immutable table of beginning and end of days, weeks, months and years as timestamp in microseconds
+    for offsets 0 to CALENDAR_OFFSETS[timeframe] before given day
+
+    :param today: day snapshot is based on (default = None, meaning today)
+
+    :return: mapping like {'today': date, 'start': {'day': (ts of offset 0, ts of offset 1, ...), ...}, 'end': {...}}
+    """
+
+    if today is None:
+        today = datetime.date.today()
+
+    start, end = {}, {}
+    for timeframe, offsets in CALENDAR_OFFSETS.items():
+        start[timeframe] = tuple(datetime_to_timestamp(get_start(timeframe, delta, today)) * 1000 for delta in range(offsets + 1))
+        end[timeframe] = tuple(datetime_to_timestamp(get_end(timeframe, delta, today)) * 1000 for delta in range(offsets + 1))
 
+    return types.MappingProxyType({'today': today, 'start': types.MappingProxyType(start), 'end': types.MappingProxyType(end)})
 
-def get_start(timeframe: str, start: int) -> datetime:
+
+def get_start(timeframe: str, start: int, today: datetime.date = None) -> datetime:
     """
     Provides start as datetime
 
     :param timeframe: timeframe as week, month, year
     :param start: beginning timeframe in x timeframes from now
+    :param today: day to be used as now (default = None, meaning today)
 
     """
 
@@ -2586,103 +4601,105 @@ def get_start(timeframe: str, start: int) -> datetime:
         start = 0
 
     if timeframe == 'week':
-        _dt_start = week_beginning(start)
+        _dt_start = week_beginning(start, today)
     elif timeframe == 'month':
-        _dt_start = month_beginning(start)
+        _dt_start = month_beginning(start, today)
     elif timeframe == 'year':
-        _dt_start = year_beginning(start)
+        _dt_start = year_beginning(start, today)
     else:
-        _dt_start = day_beginning(start)
+        _dt_start = day_beginning(start, today)
 
     return _dt_start
 
 
-def get_end(timeframe: str, end: int) -> datetime:
+def get_end(timeframe: str, end: int, today: datetime.date = None) -> datetime:
     """
     Provides end as datetime
 
     :param timeframe: timeframe as week, month, year
     :param end: end of timeframe in x timeframes from now
+    :param today: day to be used as now (default = None, meaning today)
 
     """
 
     if timeframe == 'week':
-        _dt_end = week_end(end)
+        _dt_end = week_end(end, today)
     elif timeframe == 'month':
-        _dt_end = month_end(end)
+        _dt_end = month_end(end, today)
     elif timeframe == 'year':
-        _dt_end = year_end(end)
+        _dt_end = year_end(end, today)
     else:
-        _dt_end = day_end(end)
+        _dt_end = day_end(end, today)
 
     return _dt_end
 
 
-def year_beginning(delta: int = 0) -> datetime:
+def year_beginning(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of beginning of year of today minus x years
     """
 
-    _dt = datetime.datetime.combine(datetime.date.today(), datetime.datetime.min.time())
+    _dt = datetime.datetime.combine(today or datetime.date.today(), datetime.datetime.min.time())
     return _dt.replace(month=1, day=1) - relativedelta(years=delta)
 
 
-def year_end(delta: int = 0) -> datetime:
+def year_end(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of end of year of today minus x years
     """
 
-    return year_beginning(delta) + relativedelta(years=1)
+    return year_beginning(delta, today) + relativedelta(years=1)
 
 
-def month_beginning(delta: int = 0) -> datetime:
+def month_beginning(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of beginning of month minus x month
     """
 
-    _dt = datetime.datetime.combine(datetime.date.today(), datetime.datetime.min.time())
+    _dt = datetime.datetime.combine(today or datetime.date.today(), datetime.datetime.min.time())
     return _dt.replace(day=1) - relativedelta(months=delta)
 
 
-def month_end(delta: int = 0) -> datetime:
+def month_end(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of end of month minus x month
     """
 
-    return month_beginning(delta) + relativedelta(months=1)
+    return month_beginning(delta, today) + relativedelta(months=1)
 
 
-def week_beginning(delta: int = 0) -> datetime:
+def week_beginning(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of beginning of week minus x weeks
     """
 
-    _dt = datetime.datetime.combine(datetime.date.today(), datetime.datetime.min.time())
-    return _dt - relativedelta(days=(datetime.date.today().weekday() + (delta * 7)))
+    today = today or datetime.date.today()
+    _dt = datetime.datetime.combine(today, datetime.datetime.min.time())
+    return _dt - relativedelta(days=(today.weekday() + (delta * 7)))
 
 
-def week_end(delta: int = 0) -> datetime:
+def week_end(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of end of week minus x weeks
     """
 
-    return week_beginning(delta) + relativedelta(days=6)
+    return week_beginning(delta, today) + relativedelta(days=6)
 
 
-def day_beginning(delta: int = 0) -> datetime:
+def day_beginning(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of beginning of today minus x days
     """
 
-    return datetime.datetime.combine(datetime.date.today(), datetime.datetime.min.time()) - relativedelta(days=delta)
+    return datetime.datetime.combine(today or datetime.date.today(), datetime.datetime.min.time()) - relativedelta(days=delta)
 
 
-def day_end(delta: int = 0) -> datetime:
+def day_end(delta: int = 0, today: datetime.date = None) -> datetime:
     """
     provides datetime of end of today minus x days
     """
 
-    return day_beginning(delta) + relativedelta(days=1)
+    return day_beginning(delta, today) + relativedelta(days=1)
 
 
 def datetime_to_timestamp(dt: datetime) -> int:
@@ -2693,6 +4710,358 @@ def datetime_to_timestamp(dt: datetime) -> int:
     return int(dt.replace(tzinfo=datetime.timezone.utc).timestamp())
 
 
+def get_temperature_sum_period(db_addon_fct: str, year: Union[int, str], month: Union[int, str] = None, today: datetime.date = None) -> Union[tuple, None]:
+    """
+    Provides first and last day of period of temperature sum functions like 'waermesumme'
+
+    :param db_addon_fct: kaeltesumme, waermesumme, gruenlandtempsumme or wachstumsgradtage
+    :param year: year of period; 'current' for current year (for kaeltesumme, the winter of the current season)
+    :param month: month of period (just kaeltesumme and waermesumme)
+    :param today: day to be used as now (default = None, meaning today)
+
+    :return: tuple of (start_date, end_date) or None for invalid year or month
+    """
+
+    if not valid_year(year):
+        return
+
+    if today is None:
+        today = datetime.date.today()
+
+    if db_addon_fct == 'kaeltesumme':
+        if year == 'current':
+            year = today.year - 1 if today < datetime.date(today.year, 9, 21) else today.year
+        if month is None:
+            return datetime.date(int(year), 9, 21), datetime.date(int(year) + 1, 3, 22)
+    else:
+        if year == 'current':
+            year = today.year
+        if month is None or db_addon_fct in ['gruenlandtempsumme', 'wachstumsgradtage']:
+            return datetime.date(int(year), 1, 1), datetime.date(int(year), 9, 21)
+
+    if not valid_month(month):
+        return
+
+    start_date = datetime.date(int(year), int(month), 1)
+    return start_date, start_date + relativedelta(months=+1) - datetime.timedelta(days=1)
+
+
+def get_temperature_sum_key(database_item: Item, db_addon_fct: str, year: Union[int, str], month: Union[int, str] = None, threshold: int = None, method: int = None) -> str:
+    """
+    Provides key of accumulator of temperature sum function within persistent data
+
+    :param database_item: item object of temperature sum
+    :param db_addon_fct: kaeltesumme, waermesumme, gruenlandtempsumme or wachstumsgradtage
+    :param year: year of period
+    :param month: month of period (just kaeltesumme and waermesumme)
+    :param threshold: temperature threshold (waermesumme default 0, wachstumsgradtage default 10)
+    :param method: method of wachstumsgradtage (default 0)
+
+    :return: key like 'item.path|waermesumme|2024|None|0'
+    """
+
+    if db_addon_fct == 'kaeltesumme':
+        parts = [year, month]
+    elif db_addon_fct == 'waermesumme':
+        parts = [year, month, min(0, 0 if threshold is None else threshold)]
+    elif db_addon_fct == 'gruenlandtempsumme':
+        parts = [year]
+    else:
+        parts = [year, 0 if method is None else method, 10 if threshold is None else threshold]
+    return '|'.join([str(database_item.path()), db_addon_fct] + [str(part) for part in parts])
+
+
+def get_wachstumsgradtag(min_val: float, max_val: float, threshold: int, method: int) -> float:
+    """
+    Provides wachstumsgradtag of a day based on min and max temperature
+
+    :param method: 0/10 for 'Berechnung des einfachen Durchschnitts', 1/11 for 'Modifizierte Berechnung des einfachen Durchschnitts'
+    """
+
+    if method in [1, 11]:
+        min_val = max(threshold, min_val)
+    return ((min_val + min(30.0, max_val)) / 2) - threshold
+
+
+def get_counter_reading_range(db_addon_fct: str, today: datetime.date = None) -> Union[tuple, None]:
+    """
+    Provides timeframe, start and end of 'verbrauch' and 'zaehlerstand' functions, which are based on counter readings
+
+    :param today: day to be used as now (default = None, meaning today)
+
+    :return: tuple of (timeframe, start, end) or None, if function is not based on counter readings
+    """
+
+    if not db_addon_fct:
+        return
+
+    _var = db_addon_fct.split('_')
+
+    # handle 'zaehlerstand_timeframe_timedelta' like 'zaehlerstand_heute_minus1'
+    if len(_var) == 3 and _var[0] == 'zaehlerstand' and _var[2].startswith('minus'):
+        timeframe = convert_timeframe(_var[1])
+        timedelta = to_int(_var[2][5:])
+        if timeframe is None or timedelta is None:
+            return
+        return timeframe, timedelta, timedelta
+
+    if _var[0] != 'verbrauch':
+        return
+
+    # handle 'verbrauch_timeframe_timedelta' like 'verbrauch_heute_minus2'
+    if len(_var) == 3 and _var[1] in ['heute', 'woche', 'monat', 'jahr'] and _var[2].startswith('minus'):
+        timeframe = convert_timeframe(_var[1])
+        timedelta = to_int(_var[2][5:])
+        if timeframe is None or timedelta is None:
+            return
+        return timeframe, timedelta + 1, timedelta
+
+    # handle 'verbrauch_timeframe_timedelta' like 'verbrauch_jahreszeitraum_minus1'
+    elif len(_var) == 3 and _var[1] == 'jahreszeitraum' and _var[2].startswith('minus'):
+        timedelta = to_int(_var[2][5:])  # 1 oder 2 oder 3
+        if timedelta is None:
+            return
+        if today is None:
+            today = datetime.date.today()
+        start_date = datetime.date(today.year - timedelta, 1, 1) - relativedelta(days=1)  # Start ist Tag vor dem 1.1., damit Abfrage den Maximalwert von 31.12. 00:00:00 bis 1.1. 00:00:00 ergibt
+        end_date = today - relativedelta(years=timedelta)
+        return 'day', (today - start_date).days, (today - end_date).days
+
+
+def get_rolling_window(db_addon_fct: str, today: datetime.date = None) -> Union[tuple, None]:
+    """
+    Provides first and last day of window of 'verbrauch_rolling' functions like 'verbrauch_rolling_12m_woche_minus1'
+
+    :param today: day to be used as now (default = None, meaning today)
+
+    :return: tuple of (first day, last day) or None, if function is not a valid 'verbrauch_rolling' function
+    """
+
+    if not db_addon_fct:
+        return
+
+    _var = db_addon_fct.split('_')
+    if len(_var) != 5 or _var[0] != 'verbrauch' or _var[1] != 'rolling' or not _var[4].startswith('minus'):
+        return
+
+    window_inc = to_int(_var[2][:-1])  # 12
+    window_dur = convert_timeframe(_var[2][-1])  # day, week, month, year
+    timeframe = convert_timeframe(_var[3])  # day, week, month, year
+    timedelta = to_int(_var[4][5:])  # 1
+    if not window_inc or window_dur not in ['day', 'week', 'month', 'year'] or timeframe not in ['day', 'week', 'month', 'year'] or not timedelta:
+        return
+
+    last_day = (get_end(timeframe, timedelta, today) - relativedelta(days=1)).date()
+    first_day = last_day + relativedelta(days=1) - relativedelta(**{f"{window_dur}s": window_inc})
+    return first_day, last_day
+
+
+def readings_minmax(readings: dict, ts_start: int, ts_end: int) -> tuple:
+    """
+    Provides min and max value of daily counter readings within given time range
+
+    :return: tuple of (min, max); (None, None) if no readings available
+    """
+
+    first = (ts_start - readings['ts_start']) // 86400000
+    last = (ts_end - readings['ts_start']) // 86400000
+    values = [readings['days'][day] for day in range(max(first, 0), last) if day in readings['days']]
+    if not values:
+        return None, None
+    return min(value[0] for value in values), max(value[1] for value in values)
+
+
+def readings_previous(readings: dict, ts: int) -> Union[float, None]:
+    """
+    Provides latest counter reading prior to given timestamp
+    """
+
+    first = (ts - readings['ts_start']) // 86400000
+    for day in range(first - 1, -1, -1):
+        if day in readings['days']:
+            return readings['days'][day][1]
+    return readings['prev']
+
+
+def parse_time_window(window: str) -> Union[tuple, None]:
+    """
+    Parses time window given as 'HH:MM-HH:MM'
+
+    :return: tuple of (start time, end time) or None for empty or invalid window
+    """
+
+    if not window:
+        return
+
+    try:
+        start, end = [datetime.datetime.strptime(t.strip(), '%H:%M').time() for t in window.split('-')]
+    except ValueError:
+        return
+
+    return start, end
+
+
+def in_time_window(now: datetime.time, window: tuple) -> bool:
+    """
+    Checks, if given time is within time window; window may span midnight
+    """
+
+    if not window:
+        return False
+
+    start, end = window
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end
+
+
+def is_heavy_function(db_addon_fct: str, cycle: str = None) -> bool:
+    """
+    Checks, if function is heavy and may be calculated within off-peak window
+    """
+
+    if not db_addon_fct:
+        return False
+
+    return db_addon_fct.startswith('serie_') or 'summe' in db_addon_fct or db_addon_fct == 'wachstumsgradtage' or cycle == 'yearly'
+
+
+def get_intermediate(db_addon_fct: str) -> Union[str, None]:
+    """
+    Provides kind of intermediate result of database item, the function is based on
+
+    :return: 'temperature' (daily temperatures), 'readings' (daily counter readings), 'prefix' (cumulative consumption) or None
+    """
+
+    if not db_addon_fct:
+        return
+
+    if db_addon_fct in ['kaeltesumme', 'waermesumme', 'gruenlandtempsumme', 'wachstumsgradtage']:
+        return 'temperature'
+    if get_rolling_window(db_addon_fct):
+        return 'prefix'
+    if get_counter_reading_range(db_addon_fct):
+        return 'readings'
+
+
+def get_query_category(db_addon_fct: str) -> str:
+    """
+    Provides category of db_addon_fct used for query timeout
+    """
+
+    if db_addon_fct in ALL_SERIE_ATTRIBUTES:
+        return 'serie'
+    elif db_addon_fct in ALL_COMPLEX_ATTRIBUTES:
+        return 'complex'
+    elif db_addon_fct in ALL_VERBRAUCH_ATTRIBUTES:
+        return 'verbrauch'
+    elif db_addon_fct in ALL_ZAEHLERSTAND_ATTRIBUTES:
+        return 'zaehler'
+    elif db_addon_fct in ALL_HISTORIE_ATTRIBUTES:
+        return 'wertehistorie'
+    elif db_addon_fct in ALL_TAGESMITTEL_ATTRIBUTES:
+        return 'tagesmittel'
+    elif db_addon_fct in ALL_GEN_ATTRIBUTES:
+        return 'gen'
+    return 'default'
+
+
+def is_query_timeout_error(e: Exception) -> bool:
+    """
+    Check if exception of database query was raised due to exceeded time limit (MySQL: 3024, MariaDB: 1969, SQLite: interrupted)
+    """
+
+    args = getattr(e, 'args', ())
+    if args and args[0] in (3024, 1969):
+        return True
+    return 'interrupted' in str(e).lower()
+
+
+def results_equal(result, reference, tolerance: float = 0.05) -> bool:
+    """
+    Compare results of two calculations; numbers are equal within tolerance (results are rounded to one decimal), lists are compared element-wise
+
+    :param result: first result
+    :param reference: second result
+    :param tolerance: absolute tolerance of numbers
+
+    :return: True, if results are equal
+    """
+
+    if isinstance(result, (list, tuple)) and isinstance(reference, (list, tuple)):
+        return len(result) == len(reference) and all(results_equal(a, b, tolerance) for a, b in zip(result, reference))
+    if isinstance(result, (int, float)) and isinstance(reference, (int, float)) and not isinstance(result, bool) and not isinstance(reference, bool):
+        return abs(result - reference) <= tolerance
+    return result == reference
+
+
+def percentile(values: list, q: float) -> Union[float, None]:
+    """
+    Provides percentile of sorted list of values (nearest rank)
+
+    :param values: sorted list of values
+    :param q: quantile between 0 and 1
+
+    :return: value at quantile; None for empty list
+    """
+
+    if not values:
+        return
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def get_period_key(timestamp: int, group: str, local: bool = False) -> str:
+    """
+    Provides key of period (day, week, month, year) containing given timestamp; keys of the same group are ordered like periods
+
+    :param timestamp: timestamp in microseconds
+    :param group: grouping of serie (hour, day, week, month, year)
+    :param local: timestamp is real epoch and period is defined in local time (mysql grouping in session time zone);
+                  otherwise period is defined in utc (sqlite grouping and boundaries provided by get_start_end_as_timestamp)
+
+    :return: key of period like '20240131'; Monday of week for group 'week'
+    """
+
+    dt = datetime.datetime.fromtimestamp(timestamp / 1000) if local else datetime.datetime.utcfromtimestamp(timestamp / 1000)
+    if group == 'week':
+        return (dt.date() - datetime.timedelta(days=dt.weekday())).strftime('%Y%m%d')
+    return dt.strftime(SERIE_PERIOD_FORMAT[group])
+
+
+def merge_serie(cached: list, update: list, group: str, ts_serie_start: int, ts_from: int, local: bool = False) -> list:
+    """
+    Merge last result of serie with update of the periods closed since then. Values are assigned to their period by key
+    instead of comparing timestamps, since grouped timestamps of mysql are real epoch in session time zone, whereas
+    boundaries are local midnight given as utc.
+
+    :param cached: last result of serie like [[timestamp, value], ...]
+    :param update: result of query covering the new periods
+    :param group: grouping of serie (hour, day, week, month, year)
+    :param ts_serie_start: beginning of first period of serie as provided by get_start_end_as_timestamp
+    :param ts_from: beginning of first period to be taken from update as provided by get_start_end_as_timestamp
+    :param local: timestamps of values are grouped in local time (mysql)
+
+    :return: merged serie; [[0, 0]], if no values left
+    """
+
+    key_start, key_from = get_period_key(ts_serie_start, group), get_period_key(ts_from, group)
+    result = [value for value in cached if value[0] and key_start <= get_period_key(value[0], group, local) < key_from]
+    result.extend(value for value in update if value[0] and get_period_key(value[0], group, local) >= key_from)
+    return result if result else [[0, 0]]
+
+
+def first_value(rows: list) -> Union[float, None]:
+    """
+    Provides value of first row of query response like [(time, value), ...] rounded to one decimal
+
+    :return: value; None, if no row or no value available
+    """
+
+    if not rows or rows[0][1] is None:
+        return
+    return round(rows[0][1], 1)
+
+
 def to_int(arg) -> Union[int, None]:
     try:
         return int(arg)
@@ -2700,8 +5069,30 @@ def to_int(arg) -> Union[int, None]:
         return None
 
 
+LOG_INDEX_NAME = 'db_addon_log_item_id_time'
+SQLITE_PROGRESS_STEPS = 10000
+SQLITE_READ_PRAGMAS = {'mmap_size': 268435456, 'cache_size': -65536, 'temp_store': 'MEMORY', 'query_only': 1}
+DEFAULT_QUERY_TIMEOUT = {'default': 60, 'onchange': 30, 'verbrauch': 60, 'zaehler': 60, 'wertehistorie': 60, 'tagesmittel': 120, 'gen': 60, 'serie': 300, 'complex': 300, 'fetch_raw': 60, 'maintenance': 3600}
+LOAD_TIME_BUDGET = 0.5
+STREAM_BATCH_SIZE = 1000
+RAW_QUERY_CACHE_SIZE = 128
+RUN_CACHE_TTL = 1800
+METRICS_LATENCY_SAMPLES = 200
+METRICS_QUANTILES = [0.5, 0.9, 0.99]
+CALENDAR_OFFSETS = {'day': 1100, 'week': 160, 'month': 40, 'year': 10}
+THROTTLE_CHECK_INTERVAL = 10
+REPLICA_CHECK_INTERVAL = 60
+THROTTLE_LATENCY_RATIO = [1.5, 2, 4]
+THROTTLE_MIN_SAMPLES = 5
+THROTTLE_THREADS_FACTOR = [0.5, 0.75, 1]
+THROTTLE_DELAY = [0, 1, 3, 10]
+THROTTLE_BUDGET_FACTOR = [1, 0.5, 0.25, 0]
+OFFPEAK_MAX_DEFERRAL = 86400
+QUEUE_CREATE_LOG_INDEX = 'create_log_index'
+SERIE_PERIOD_FORMAT = {'hour': '%Y%m%d%H', 'day': '%Y%m%d', 'month': '%Y%m', 'year': '%Y'}
 ALLOWED_QUERY_TIMEFRAMES = ['year', 'month', 'week', 'day', 'hour']
 ALLOWED_MINMAX_FUNCS = ['min', 'max', 'avg']
+ALLOWED_MULTI_ITEM_FUNCS = ['avg', 'min', 'max', 'sum', 'on', 'integrate', 'raw']
 ALL_ONCHANGE_ATTRIBUTES = ['verbrauch_heute', 'verbrauch_woche', 'verbrauch_monat', 'verbrauch_jahr', 'minmax_heute_min', 'minmax_heute_max', 'minmax_woche_min', 'minmax_woche_max', 'minmax_monat_min', 'minmax_monat_max', 'minmax_jahr_min', 'minmax_jahr_max', 'tagesmitteltemperatur_heute']
 ALL_DAILY_ATTRIBUTES = ['verbrauch_heute_minus1', 'verbrauch_heute_minus2', 'verbrauch_heute_minus3', 'verbrauch_heute_minus4', 'verbrauch_heute_minus5', 'verbrauch_heute_minus6', 'verbrauch_heute_minus7', 'verbrauch_rolling_12m_heute_minus1', 'verbrauch_jahreszeitraum_minus1', 'verbrauch_jahreszeitraum_minus2', 'verbrauch_jahreszeitraum_minus3', 'zaehlerstand_heute_minus1', 'zaehlerstand_heute_minus2', 'zaehlerstand_heute_minus3', 'minmax_last_24h_min', 'minmax_last_24h_max', 'minmax_last_24h_avg', 'minmax_last_7d_min', 'minmax_last_7d_max', 'minmax_last_7d_avg', 'minmax_heute_minus1_min', 'minmax_heute_minus1_max', 'minmax_heute_minus1_avg', 'minmax_heute_minus2_min', 'minmax_heute_minus2_max', 'minmax_heute_minus2_avg', 'minmax_heute_minus3_min', 'minmax_heute_minus3_max', 'minmax_heute_minus3_avg', 'tagesmitteltemperatur_heute_minus1', 'tagesmitteltemperatur_heute_minus2', 'tagesmitteltemperatur_heute_minus3', 'serie_minmax_tag_min_30d', 'serie_minmax_tag_max_30d', 'serie_minmax_tag_avg_30d', 'serie_verbrauch_tag_30d', 'serie_zaehlerstand_tag_30d', 'serie_tagesmittelwert_stunde_0d', 'serie_tagesmittelwert_tag_stunde_30d', 'kaeltesumme', 'waermesumme', 'gruenlandtempsumme', 'tagesmitteltemperatur', 'wachstumsgradtage']
 ALL_WEEKLY_ATTRIBUTES = ['verbrauch_woche_minus1', 'verbrauch_woche_minus2', 'verbrauch_woche_minus3', 'verbrauch_woche_minus4', 'verbrauch_rolling_12m_woche_minus1', 'zaehlerstand_woche_minus1', 'zaehlerstand_woche_minus2', 'zaehlerstand_woche_minus3', 'minmax_woche_minus1_min', 'minmax_woche_minus1_max', 'minmax_woche_minus1_avg', 'minmax_woche_minus2_min', 'minmax_woche_minus2_max', 'minmax_woche_minus2_avg', 'serie_minmax_woche_min_30w', 'serie_minmax_woche_max_30w', 'serie_minmax_woche_avg_30w', 'serie_verbrauch_woche_30w', 'serie_zaehlerstand_woche_30w']
@@ -2740,3 +5131,5 @@ ALL_COMPLEX_ATTRIBUTES = ['kaeltesumme', 'waermesumme', 'gruenlandtempsumme', 't
     'serie_tagesmittelwert_stunde_30d':     {'func': 'avg1',        'timeframe': 'day',   'start': 30,   'end': 0,    'group': 'hour', 'group2': 'day'},
     'gts':                                  {'func': 'max',         'timeframe': 'year',  'start': None, 'end': None, 'group': 'day'},
 """
+
+IMPORT_DURATION = time.perf_counter() - _IMPORT_START
@@ -0,0 +1,56 @@
+import datetime
+import os
+import time
+import unittest
+
+from plugins.db_addon import merge_serie, datetime_to_timestamp
+
+
+class TestSerieMerge(unittest.TestCase):
+    """Incremental update of 'serie' items with mysql grouping in a non-UTC session time zone"""
+
+    def setUp(self):
+        self._tz = os.environ.get('TZ')
+        os.environ['TZ'] = 'Europe/Berlin'
+        time.tzset()
+
+    def tearDown(self):
+        if self._tz is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = self._tz
+        time.tzset()
+
+    @staticmethod
+    def local_ms(*args) -> int:
+        """real epoch of local time in microseconds, like time of row grouped by mysql in session time zone"""
+        return int(datetime.datetime(*args).timestamp() * 1000)
+
+    @staticmethod
+    def boundary_ms(*args) -> int:
+        """local midnight given as utc, like boundaries of get_start_end_as_timestamp"""
+        return datetime_to_timestamp(datetime.datetime(*args)) * 1000
+
+    def test_partial_period_is_updated(self):
+        # serie of 3 days calculated on 2.1., updated on 3.1.; first row of a day is at local 00:10 (23:10 utc of day before)
+        cached = [[self.local_ms(2024, 1, 1, 0, 10), 1.0], [self.local_ms(2024, 1, 2, 0, 10), 2.0]]
+        update = [[self.local_ms(2024, 1, 2, 0, 10), 2.5], [self.local_ms(2024, 1, 3, 0, 10), 3.0]]
+        result = merge_serie(cached, update, 'day', self.boundary_ms(2024, 1, 1), self.boundary_ms(2024, 1, 2), local=True)
+        self.assertEqual(result, [[self.local_ms(2024, 1, 1, 0, 10), 1.0], [self.local_ms(2024, 1, 2, 0, 10), 2.5], [self.local_ms(2024, 1, 3, 0, 10), 3.0]])
+
+    def test_old_periods_are_dropped(self):
+        cached = [[self.local_ms(2023, 12, 31, 0, 10), 0.5], [self.local_ms(2024, 1, 1, 0, 10), 1.0], [self.local_ms(2024, 1, 2, 0, 10), 2.0]]
+        update = [[self.local_ms(2024, 1, 2, 0, 10), 2.5], [self.local_ms(2024, 1, 3, 0, 10), 3.0]]
+        result = merge_serie(cached, update, 'day', self.boundary_ms(2024, 1, 1), self.boundary_ms(2024, 1, 2), local=True)
+        self.assertEqual([value[1] for value in result], [1.0, 2.5, 3.0])
+
+    def test_week_of_utc_grouping(self):
+        # sqlite groups by utc; weeks are identified by their monday
+        cached = [[self.boundary_ms(2024, 1, 1, 12), 1.0], [self.boundary_ms(2024, 1, 8, 12), 2.0]]
+        update = [[self.boundary_ms(2024, 1, 9, 12), 2.5], [self.boundary_ms(2024, 1, 15, 12), 3.0]]
+        result = merge_serie(cached, update, 'week', self.boundary_ms(2024, 1, 1), self.boundary_ms(2024, 1, 8))
+        self.assertEqual([value[1] for value in result], [1.0, 2.5, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -106,12 +106,35 @@ class WebInterface(SmartPluginWebIf):
             data['maintenance'] = True if self.plugin.log_level == 10 else False
             data['queue_length'] = self.plugin.queue_backlog()
             data['active_queue_item'] = self.plugin.active_queue_item
+            data['overdue_query_count'] = self.plugin.overdue_query_count
+            data['deferred_items'] = len(self.plugin.deferred_items)
+            data['throttle_level'] = self.plugin.throttle_level
+            data['read_connection'] = self.plugin.read_connection_status()
+            data['shadow_summary'] = self.plugin.shadow_summary()
+            data['log_index_creation'] = self.plugin.log_index_creation_status()
+            data['query_latency'] = f"{self.plugin.query_latency['fast']} / {self.plugin.query_latency['slow']}" if self.plugin.query_latency['slow'] is not None else '-'
+            if self.plugin.overdue_queries:
+                _last = self.plugin.overdue_queries[-1]
+                data['last_overdue_query'] = f"{_last['time']} {_last['item']} ({_last['category']}, {_last['timeout']}s)"
+            else:
+                data['last_overdue_query'] = '-'
 
             try:
                 return json.dumps(data, default=str)
             except Exception as e:
                 self.logger.error(f"get_data_html exception: {e}")
 
+    @cherrypy.expose
+    def metrics(self):
+        """
+        Return performance metrics of the plugin in Prometheus / OpenMetrics text format
+
+        :return: metrics as text
+        """
+
+        cherrypy.response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        return self.plugin.get_metrics()
+
     @cherrypy.expose
     def recalc_all(self):
         self.logger.debug(f"recalc_all called")
@@ -127,6 +150,11 @@ class WebInterface(SmartPluginWebIf):
         self.logger.debug(f"_clear_queue called")
         self.plugin._clear_queue()
 
+    @cherrypy.expose
+    def create_log_index(self):
+        self.logger.debug(f"create_log_index called")
+        self.plugin.create_log_index()
+
     @cherrypy.expose
     def activate(self):
         self.logger.debug(f"active called")